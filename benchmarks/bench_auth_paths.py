@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""Measure JIRA context entry/exit latency for each authentication path against a local stub JIRA server.
+
+Starts a stub JIRA server on 127.0.0.1 (no network access needed) which issues JSESSIONID cookies on basic
+authentication, rejects unknown or expired cookies with HTTP 401 and delays every response by --latency milliseconds.
+Then times `with JIRA(): pass` for these scenarios:
+
+    cold       no cookie cache file, password login.
+    warm       valid cookie in the cache file, cookie is validated and reused.
+    expired    cookie in the cache file was expired by the server, falls back to a password login.
+    threads    --concurrency threads enter at the same time with a warm cache file.
+    processes  --concurrency processes enter at the same time with a warm cache file.
+
+Each run is timed as if it was a new process (in-process session pool and single-flight state are cleared in between).
+Reported are p50/p99 latency plus HTTP requests and password logins per context entry, so extra round trips show up.
+Newer jira clients retry HTTP 401 responses with multi-second sleeps, so retries are disabled by default.
+
+Usage: python benchmarks/bench_auth_paths.py [--runs N] [--latency MS] [--session-expiry SECONDS] [--concurrency N]
+       [--client-retries N] [--scenario NAME ...]
+"""
+
+from __future__ import print_function
+import argparse
+import base64
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jira_context  # noqa
+from jira_context import INPUT, JIRA  # noqa
+
+_SESSION_POOL = getattr(jira_context, '_SESSION_POOL')
+_SINGLE_FLIGHT = getattr(jira_context, '_SINGLE_FLIGHT')
+_flush_pending_saves = getattr(jira_context, '_flush_pending_saves')
+
+SCENARIOS = ('cold', 'warm', 'expired', 'threads', 'processes')
+SERVER_INFO = dict(baseUrl='', version='6.4.0', versionNumbers=[6, 4, 0], deploymentType='Server', serverTitle='Stub')
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Stub JIRA server. Keeps issued sessions and counts requests."""
+
+    daemon_threads = True
+
+    def __init__(self, latency, session_expiry):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.session_expiry = session_expiry
+        self.lock = threading.Lock()
+        self.sessions = dict()
+        self.requests = self.logins = 0
+
+    @property
+    def url(self):
+        """Base URL of the server."""
+        return 'http://{0}:{1}'.format(*self.server_address[:2])
+
+    def expire_sessions(self):
+        """Forget every issued session, as if they all timed out."""
+        with self.lock:
+            self.sessions.clear()
+
+    def reset_counters(self):
+        """Zero the request and login counters."""
+        with self.lock:
+            self.requests = self.logins = 0
+
+    def valid(self, session_id):
+        """Return True if `session_id` was issued and hasn't expired."""
+        with self.lock:
+            issued = self.sessions.get(session_id)
+        return issued is not None and (not self.session_expiry or time.time() - issued < self.session_expiry)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the few JIRA REST endpoints used while authenticating."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *_):
+        """Silence per-request logging to stderr."""
+        pass
+
+    def respond(self, status, body, cookie=None):
+        """Send a JSON response."""
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if cookie:
+            self.send_header('Set-Cookie', 'JSESSIONID={0}; Path=/; HttpOnly'.format(cookie))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_request(self):
+        """Authenticate the request with the JSESSIONID cookie or basic authentication, then answer it."""
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        path = self.path.split('?')[0]
+        if path.endswith('/serverInfo'):
+            return self.respond(200, SERVER_INFO)
+        if path.endswith('/field'):
+            return self.respond(200, list())  # Anonymous access, like JIRA's own.
+
+        cookie = None
+        cookies = dict(c.strip().partition('=')[::2] for c in (self.headers.get('Cookie') or '').split(';'))
+        authorization = self.headers.get('Authorization') or ''
+        if server.valid(cookies.get('JSESSIONID')):
+            pass
+        elif authorization.startswith('Basic '):
+            if not base64.b64decode(authorization[6:].encode('ascii')).decode('utf-8').partition(':')[2]:
+                return self.respond(401, dict(errorMessages=['Login failed']))
+            cookie = uuid.uuid4().hex.upper()
+            with server.lock:
+                server.logins += 1
+                server.sessions[cookie] = time.time()
+        else:
+            return self.respond(401, dict(errorMessages=['You are not authenticated.']))
+
+        if path.endswith('/rest/auth/1/session'):
+            return self.respond(200, dict(self='{0}/rest/api/2/user?username=user'.format(server.url), name='user',
+                                          loginInfo=dict()), cookie)
+        return self.respond(404, dict(errorMessages=['Not implemented by the stub server.']), cookie)
+
+    do_DELETE = do_GET = do_POST = do_PUT = handle_request
+
+
+def percentile(values, percent):
+    """Return the value below which `percent` percent of the sorted values fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+
+
+def configure(file_path):
+    """Point JIRA at the benchmark's cookie cache file and answer password prompts automatically."""
+    setattr(jira_context, '_prompt', lambda f, _: 'user' if f == INPUT else 'pass')
+    JIRA.COOKIE_CACHE_FILE_PATH = file_path
+    JIRA.SESSION_POOL_SIZE = 0
+    JIRA.TRUST_WINDOW = 0
+
+
+def enter_exit(url, kwargs):
+    """Enter and exit one JIRA context as a new process would. Returns the elapsed time in milliseconds."""
+    _SESSION_POOL.clear()
+    _SINGLE_FLIGHT.clear()
+    started = time.time()
+    with JIRA(server=url, **kwargs) as j:
+        if j.authentication_failed:
+            raise RuntimeError('Authentication failed.')
+    _flush_pending_saves()
+    return (time.time() - started) * 1000
+
+
+def concurrently(url, kwargs, count):
+    """Enter and exit a JIRA context in `count` threads at once. Returns each thread's elapsed time in milliseconds."""
+    _SESSION_POOL.clear()
+    _SINGLE_FLIGHT.clear()
+    start, timings = threading.Event(), list()
+
+    def target():
+        start.wait()
+        started = time.time()
+        with JIRA(server=url, **kwargs):
+            pass
+        timings.append((time.time() - started) * 1000)
+
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    return timings
+
+
+def worker(file_path, url, kwargs, start, results):
+    """Process target for the processes scenario."""
+    configure(file_path)
+    start.wait()
+    results.put(enter_exit(url, kwargs))
+
+
+def in_processes(file_path, url, kwargs, count):
+    """Enter and exit a JIRA context in `count` processes at once. Process start up time isn't included."""
+    start, results = multiprocessing.Event(), multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(file_path, url, kwargs, start, results))
+                 for _ in range(count)]
+    for process in processes:
+        process.start()
+    start.set()
+    timings = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return timings
+
+
+def run_scenario(name, server, file_path, kwargs, runs, concurrency):
+    """Time one scenario. Returns (timings, context entries)."""
+    if name != 'cold':
+        enter_exit(server.url, kwargs)  # Seed the cookie cache file with a valid session.
+    server.reset_counters()
+    timings = list()
+    for _ in range(runs):
+        if name == 'cold' and os.path.exists(file_path):
+            os.remove(file_path)
+        if name == 'expired':
+            server.expire_sessions()
+        if name == 'threads':
+            timings.extend(concurrently(server.url, kwargs, concurrency))
+        elif name == 'processes':
+            timings.extend(in_processes(file_path, server.url, kwargs, concurrency))
+        else:
+            timings.append(enter_exit(server.url, kwargs))
+    return timings, len(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50, help='runs per scenario (default: 50)')
+    parser.add_argument('--latency', type=float, default=20, help='stub server delay per request in ms (default: 20)')
+    parser.add_argument('--session-expiry', type=float, default=0,
+                        help='seconds before the stub server expires a session, 0 never (default: 0)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='threads/processes entering at once per run (default: 8)')
+    parser.add_argument('--client-retries', type=int, default=0,
+                        help='max_retries passed to the jira client, -1 to leave its default (default: 0)')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+                        help='scenario to run, may be repeated (default: all)')
+    args = parser.parse_args()
+    kwargs = dict() if args.client_retries < 0 else dict(max_retries=args.client_retries)
+
+    server = StubServer(args.latency / 1000.0, args.session_expiry)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    directory = tempfile.mkdtemp()
+    file_path = os.path.join(directory, '.jira_session_json')
+    configure(file_path)
+    try:
+        print('{0:<11}{1:>8}{2:>12}{3:>12}{4:>14}{5:>12}'.format(
+            'Scenario', 'entries', 'p50 (ms)', 'p99 (ms)', 'requests/run', 'logins/run'))
+        for name in args.scenarios or SCENARIOS:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            timings, entries = run_scenario(name, server, file_path, kwargs, args.runs, args.concurrency)
+            print('{0:<11}{1:>8}{2:>12.3f}{3:>12.3f}{4:>14.2f}{5:>12.2f}'.format(
+                name, entries, percentile(timings, 50), percentile(timings, 99), server.requests / float(entries),
+                server.logins / float(entries)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Measure cookie cache contention between many processes entering and exiting JIRA contexts at the same time.
+
+Each worker process repeatedly does what JIRA.__init__() and JIRA.__exit__() do with the cookie cache file: read the
+cached session for its server (context entry) and save a refreshed session (context exit). A missing session means the
+worker would have prompted for a password, so it's counted as a re-authentication. A cache file which is missing or
+can't be parsed is counted as a corrupted read.
+
+Usage: python benchmarks/bench_cookie_contention.py [--processes N] [--cycles N] [--servers N]
+"""
+
+from __future__ import print_function
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jira_context  # noqa
+
+_decode_index = getattr(jira_context, '_decode_index')
+_decode_payload = getattr(jira_context, '_decode_payload')
+_find_session = getattr(jira_context, '_find_session')
+_read_cache = getattr(jira_context, '_read_cache')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def worker(file_path, server, cycles, start, results):
+    """Cycle through context entry and exit, counting re-authentications and corrupted reads."""
+    start.wait()
+    reauthentications = corrupted = 0
+    for i in range(cycles):
+        # Context entry.
+        try:
+            with open(file_path, 'rb') as f:
+                contents = f.read()
+            for record in _decode_index(contents):
+                _decode_payload(contents, record)
+        except (IOError, OSError, ValueError):
+            corrupted += 1
+        if _find_session(_read_cache(file_path), server, 'user')[1] is None:
+            reauthentications += 1
+
+        # Context exit.
+        _save_cookies(file_path, dict(JSESSIONID='C{0}'.format(i)), time.time(), server, 'user')
+    results.put((reauthentications, corrupted))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=32, help='concurrent worker processes (default: 32)')
+    parser.add_argument('--cycles', type=int, default=50, help='enter/exit cycles per process (default: 50)')
+    parser.add_argument('--servers', type=int, default=4, help='distinct JIRA servers in the cache (default: 4)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    file_path = os.path.join(directory, '.jira_session_json')
+    servers = ['http://jira{0}.local'.format(i) for i in range(args.servers)]
+    for server in servers:
+        _save_cookies(file_path, dict(JSESSIONID='INITIAL'), time.time(), server, 'user')
+
+    start, results = multiprocessing.Event(), multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(file_path, servers[i % len(servers)], args.cycles, start,
+                                                              results)) for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    started = time.time()
+    start.set()
+    counts = [results.get() for _ in processes]
+    elapsed = time.time() - started
+    for process in processes:
+        process.join()
+    shutil.rmtree(directory)
+
+    total = args.processes * args.cycles
+    print('Processes:          {0}'.format(args.processes))
+    print('Enter/exit cycles:  {0} ({1:.0f}/s)'.format(total, total / elapsed))
+    print('Re-authentications: {0}'.format(sum(c[0] for c in counts)))
+    print('Corrupted reads:    {0}'.format(sum(c[1] for c in counts)))
+
+
+if __name__ == '__main__':
+    main()
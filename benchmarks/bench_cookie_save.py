@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Measure cookie cache save latency under each COOKIE_DURABILITY policy.
+
+Saves a session (as JIRA.__exit__() does) many times in a row and reports per-save latency. For the write-behind policy
+the single flush done at interpreter exit is reported separately. Point --directory at the file system to measure (e.g.
+an NFS home directory), it defaults to a local temporary directory.
+
+Usage: python benchmarks/bench_cookie_save.py [--saves N] [--directory PATH]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jira_context  # noqa
+
+_flush_pending_saves = getattr(jira_context, '_flush_pending_saves')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def percentile(values, percent):
+    """Return the value below which `percent` percent of the sorted values fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--saves', type=int, default=200, help='saves per policy (default: 200)')
+    parser.add_argument('--directory', help='directory to write the cache file in (default: temporary directory)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.directory)
+    try:
+        print('{0:<14}{1:>12}{2:>12}{3:>12}{4:>12}'.format('Policy', 'mean (ms)', 'p50 (ms)', 'p99 (ms)', 'flush (ms)'))
+        for durability in ('always', 'never', 'write-behind'):
+            file_path = os.path.join(directory, '.jira_session_json_' + durability)
+            timings = list()
+            for i in range(args.saves):
+                started = time.time()
+                _save_cookies(file_path, dict(JSESSIONID='ABC{0}'.format(i)), time.time(), 'http://jira.local', 'user',
+                              durability=durability)
+                timings.append((time.time() - started) * 1000)
+            started = time.time()
+            _flush_pending_saves()
+            flush = (time.time() - started) * 1000
+            print('{0:<14}{1:>12.3f}{2:>12.3f}{3:>12.3f}{4:>12.3f}'.format(
+                durability, sum(timings) / len(timings), percentile(timings, 50), percentile(timings, 99), flush))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
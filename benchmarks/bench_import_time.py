@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Measure how long `import jira_context` takes in a new interpreter and fail if it's over budget.
+
+Starts a new Python interpreter for every run (so nothing is cached in sys.modules) and times the import statement
+alone, excluding interpreter start up. Exits with status 1 if the median is above --budget milliseconds, so it can run
+in CI. jira.client and requests are only imported when the first JIRA instance is created, a regression there usually
+shows up as a ten fold increase.
+
+Usage: python benchmarks/bench_import_time.py [--runs N] [--budget MS]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE = ("import time; started = time.time(); import jira_context; elapsed = time.time() - started; import sys; "
+        "print(elapsed * 1000, ' '.join(m for m in ('jira', 'requests', 'asyncio') if m in sys.modules))")
+
+
+def percentile(values, percent):
+    """Return the value below which `percent` percent of the sorted values fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='interpreters to start (default: 20)')
+    parser.add_argument('--budget', type=float, default=50, help='maximum median import time in ms (default: 50)')
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get('PYTHONPATH', '')]))
+    timings, heavy = list(), set()
+    for _ in range(args.runs):
+        output = subprocess.check_output([sys.executable, '-c', CODE], env=env, cwd=ROOT).decode('ascii').split()
+        timings.append(float(output[0]))
+        heavy.update(output[1:])
+
+    median = percentile(timings, 50)
+    print('Runs:            {0}'.format(args.runs))
+    print('p50 (ms):        {0:.3f}'.format(median))
+    print('p99 (ms):        {0:.3f}'.format(percentile(timings, 99)))
+    print('Budget (ms):     {0:.3f}'.format(args.budget))
+    print('Eager imports:   {0}'.format(' '.join(sorted(heavy)) or 'none'))
+    if median > args.budget:
+        print('Over budget.', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
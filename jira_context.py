@@ -11,81 +11,1485 @@ https://pypi.python.org/pypi/jira-context
 """
 
 from __future__ import print_function
+import atexit
 import base64
+import calendar
+from collections import namedtuple
+from contextlib import contextmanager
+import functools
 from getpass import getpass
+import hashlib
+import itertools
 import json
+import logging
+import mmap
 import os
+import re
+import struct
 import sys
+import tempfile
+import threading
+import time
+import weakref
 
-import jira.client
-from jira.exceptions import JIRAError
+try:
+    import fcntl
+except ImportError:  # Windows.
+    fcntl = None
+
+try:
+    from queue import Full, Queue
+except ImportError:  # Python 2.
+    from Queue import Full, Queue
 
 __author__ = '@Robpol86'
 __license__ = 'MIT'
 __version__ = '1.0.0'
 
-_PY3 = bool(sys.version_info[0] == 3)
-INPUT = input if _PY3 else raw_input
+_BACKOFF_STATUS_CODES = (429, 503)  # Too Many Requests and Service Unavailable, back off _RateLimiter.
+_CACHE_HEADER = struct.Struct('>8sHH')  # Magic, format version, number of sessions.
+_CACHE_MAGIC = b'JIRACTX\x00'
+_CACHE_RECORD = struct.Struct('>8s8sddII')  # Server hash, user hash, saved, expires (0: never), payload offset, length.
+_CACHE_VERSION = 1
+_MAX_CACHE_FILE_SIZE = 1048576
+_PY3 = bool(sys.version_info[0] == 3)
+_REPLACE = getattr(os, 'replace', os.rename)  # os.rename() doesn't overwrite on Windows.
+_STORE_CHUNK_SIZE = 500  # Keys per _IssueStore statement, below SQLite's limit of 999 parameters.
+_STORE_COLUMNS = ('project', 'status', 'assignee')  # Indexed columns of _IssueStore besides key and updated.
+_STORE_SCHEMA = (
+    'DROP TABLE IF EXISTS issues',
+    'DROP TABLE IF EXISTS syncs',
+    'CREATE TABLE issues (server TEXT, user TEXT, key TEXT, project TEXT, status TEXT, assignee TEXT, updated REAL, '
+    'json TEXT, PRIMARY KEY (server, user, key))',
+    'CREATE INDEX issues_project ON issues (server, user, project, updated)',
+    'CREATE INDEX issues_status ON issues (server, user, status, updated)',
+    'CREATE INDEX issues_assignee ON issues (server, user, assignee, updated)',
+    'CREATE INDEX issues_updated ON issues (server, user, updated)',
+    'CREATE TABLE syncs (server TEXT, user TEXT, jql TEXT, high_water REAL, synced REAL, '
+    'PRIMARY KEY (server, user, jql))',
+)
+_STORE_VERSION = 2  # SQLite user_version of _STORE_SCHEMA.
+_UNCACHED_HEADERS = ('connection', 'content-encoding', 'content-length', 'keep-alive', 'transfer-encoding')
+_TEXT = type(u'')  # unicode on Python 2, str on Python 3.
+INPUT = input if _PY3 else raw_input
+
+jira = requests = None  # Imported by _import_client() when first needed, importing them takes a while.
+# JIRAError (jira.exceptions.JIRAError) is set by _import_client() too, see __getattr__() for earlier lookups.
+
+_IMPORT_LOCK = threading.Lock()
+_PENDING_SAVES = dict()  # File path: {(server URL, username): session dict}, see _save_cookies(durability).
+_PENDING_SAVES_LOCK = threading.Lock()
+_SESSION_TOKENS = dict()  # Server URL: {username: session dict}, see install_session_token().
+
+
+def _number(value):
+    """Return value if it's an int or float (but not a bool), otherwise None."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _sanitize_session(entry):
+    """Validate one cached session read from file. Filters out everything but JSESSIONID and its metadata.
+
+    Positional arguments:
+    entry -- dict parsed from the cache file.
+
+    Returns:
+    Dict with JSESSIONID, validated, expires, saved, server_info, and server_info_saved keys. None if the entry is
+    invalid or expired.
+    """
+    try:
+        jsessionid = entry.get('JSESSIONID')
+        if not jsessionid.isalnum():
+            return None
+    except AttributeError:
+        return None
+    expires = _number(entry.get('expires'))
+    if expires is not None and expires <= time.time():
+        return None
+    server_info, server_info_saved = entry.get('server_info'), _number(entry.get('server_info_saved'))
+    if not isinstance(server_info, dict) or server_info_saved is None:
+        server_info, server_info_saved = None, None
+    return dict(JSESSIONID=jsessionid, validated=_number(entry.get('validated')), expires=expires,
+                saved=_number(entry.get('saved')) or 0, server_info=server_info, server_info_saved=server_info_saved)
+
+
+def _digest(value):
+    """Return the 8 byte hash of a server URL or username stored in the cookie cache file index."""
+    return hashlib.sha1(value.encode('utf-8')).digest()[:8]
+
+
+def _encode_cache(cache):
+    """Serialize sessions into the cookie cache file format.
+
+    The file starts with a header (_CACHE_HEADER: magic bytes, format version, and number of sessions) followed by one
+    fixed size index record per session (_CACHE_RECORD: hashes of the server URL and username, when the session was
+    saved and expires, and where its payload is) and then the payloads: one JSON object per session. Looking up a
+    session only reads the index and decodes a single payload, see _lookup_session().
+
+    Positional arguments:
+    cache -- dict of dicts: {server URL: {username: session dict}}.
+
+    Returns:
+    Bytes.
+    """
+    records, payloads = list(), list()
+    offset = _CACHE_HEADER.size + _CACHE_RECORD.size * sum(len(u) for u in cache.values())
+    for server in sorted(cache):
+        for user in sorted(cache[server]):
+            session = cache[server][user]
+            payload = json.dumps(dict(session, server=server, user=user), sort_keys=True).encode('ascii')
+            records.append(_CACHE_RECORD.pack(_digest(server), _digest(user), session['saved'],
+                                              session['expires'] or 0, offset, len(payload)))
+            payloads.append(payload)
+            offset += len(payload)
+    return b''.join([_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, len(records))] + records + payloads)
+
+
+def _decode_index(contents):
+    """Parse the header and index of the cookie cache file format (see _encode_cache()).
+
+    Positional arguments:
+    contents -- bytes or mmap.mmap instance of the whole file.
+
+    Returns:
+    List of tuples (server hash, user hash, saved, expires, payload offset, payload length).
+
+    Raises:
+    ValueError -- if the magic bytes, version, or index are invalid.
+    """
+    if len(contents) < _CACHE_HEADER.size:
+        raise ValueError('Truncated header.')
+    magic, version, count = _CACHE_HEADER.unpack(contents[:_CACHE_HEADER.size])
+    if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+        raise ValueError('Unknown file format.')
+    end = _CACHE_HEADER.size + _CACHE_RECORD.size * count
+    if len(contents) < end:
+        raise ValueError('Truncated index.')
+    index, size = contents[_CACHE_HEADER.size:end], _CACHE_RECORD.size
+    records = [_CACHE_RECORD.unpack(index[i:i + size]) for i in range(0, len(index), size)]
+    if any(r[4] < end or r[4] + r[5] > len(contents) for r in records):
+        raise ValueError('Payload out of bounds.')
+    return records
+
+
+def _decode_payload(contents, record):
+    """Parse one session payload of the cookie cache file format.
+
+    Positional arguments:
+    contents -- bytes or mmap.mmap instance of the whole file.
+    record -- tuple returned by _decode_index().
+
+    Returns:
+    Tuple: server URL, username, and sanitized session dict (None if invalid or expired).
+
+    Raises:
+    ValueError -- if the payload isn't a JSON object with the server URL and username hashed in its index record.
+    """
+    payload = json.loads(contents[record[4]:record[4] + record[5]].decode('ascii'))
+    try:
+        server, user = payload['server'], payload['user']
+        if (_digest(server), _digest(user)) != record[:2]:
+            raise ValueError('Payload does not match index.')
+    except (AttributeError, KeyError, TypeError):
+        raise ValueError('Invalid payload.')
+    return server, user, _sanitize_session(payload)
+
+
+def _read_cache_file(file_path):
+    """Read every cached session from file, dropping expired ones.
+
+    Files written by older versions are base64 encoded JSON. The oldest hold a single JSESSIONID for an unknown server
+    and user. That session is returned under server '' and user ''.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+
+    Returns:
+    Dict of dicts: {server URL: {username: session dict}}. Otherwise returns an empty dict.
+    """
+    # Check file.
+    if not os.path.isfile(file_path) or not os.access(file_path, os.R_OK):
+        return dict()
+
+    # Read file.
+    with open(file_path, 'rb') as f:
+        contents = f.read(_MAX_CACHE_FILE_SIZE)
+    if not contents:
+        return dict()
+
+    # Parse file.
+    cache = dict()
+    try:
+        if contents.startswith(_CACHE_MAGIC):
+            for record in _decode_index(contents):
+                server, user, sanitized = _decode_payload(contents, record)
+                if sanitized:
+                    cache.setdefault(server, dict())[user] = sanitized
+            return cache
+        decoded = base64.b64decode(contents).decode('ascii')
+        parsed = json.loads(decoded)
+        sessions = parsed['sessions'] if 'sessions' in parsed else {'': {'': parsed}}
+        for server, users in sessions.items():
+            for user, entry in users.items():
+                sanitized = _sanitize_session(entry)
+                if sanitized:
+                    cache.setdefault(server, dict())[user] = sanitized
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return dict()
+
+    return cache
+
+
+def _read_cache(file_path):
+    """Read every cached session from file, including sessions saved by this process but not yet written to it.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+
+    Returns:
+    Dict of dicts: {server URL: {username: session dict}}. Otherwise returns an empty dict.
+    """
+    cache = _read_cache_file(file_path)
+    with _PENDING_SAVES_LOCK:
+        pending = dict(_PENDING_SAVES.get(file_path, dict()))
+    if pending:
+        _merge_sessions(cache, pending)
+    return cache
+
+
+def _find_session(cache, server=None, user=None):
+    """Look up a cached session.
+
+    Positional arguments:
+    cache -- dict returned by _read_cache().
+
+    Keyword arguments:
+    server -- JIRA server URL. Falls back to the session cached by older versions (server '') if there is none for this
+        server. None matches every server.
+    user -- username. Falls back to sessions with an unknown user (''). None matches every user.
+
+    Returns:
+    Tuple: username of the session ('' if unknown) and the session dict. (None, None) if nothing matches.
+    """
+    if server is None:
+        candidates = [(u, e) for users in cache.values() for u, e in users.items()]
+    else:
+        candidates = list((cache.get(server) or cache.get('') or dict()).items())
+    if user is not None:
+        candidates = [(u, e) for u, e in candidates if u in (user, '')]
+    if not candidates:
+        return None, None
+    return max(candidates, key=lambda c: (c[0] == user, c[1]['saved']))
+
+
+def _lookup_session(file_path, server=None, user=None):
+    """Look up one cached session in file, like _find_session(_read_cache(file_path), server, user) but faster.
+
+    Only the index of the file is read (memory mapped) and a single session payload is decoded. Files written by older
+    versions are decoded entirely and converted to the current format.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+
+    Keyword arguments:
+    server -- JIRA server URL, see _find_session().
+    user -- username, see _find_session().
+
+    Returns:
+    Tuple: username of the session ('' if unknown) and the session dict. (None, None) if nothing matches.
+    """
+    with _PENDING_SAVES_LOCK:
+        pending = bool(_PENDING_SAVES.get(file_path))
+    if pending or not os.path.isfile(file_path) or not os.access(file_path, os.R_OK):
+        return _find_session(_read_cache(file_path), server, user)
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size or size > _MAX_CACHE_FILE_SIZE:
+            return None, None
+        contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if contents[:len(_CACHE_MAGIC)] != _CACHE_MAGIC:
+            # Written by an older version.
+            cache = _read_cache_file(file_path)
+            if cache:
+                try:
+                    _write_sessions(file_path, dict())
+                except (IOError, OSError):
+                    pass  # Read only, try again next time.
+            return _find_session(cache, server, user)
+
+        # Same rules as _find_session(), applied to the index.
+        now, unknown = time.time(), _digest('')
+        records = [r for r in _decode_index(contents) if not r[3] or r[3] > now]
+        if server is not None:
+            server_digest = _digest(server)
+            records = [r for r in records if r[0] == server_digest] or [r for r in records if r[0] == unknown]
+        user_digest = None if user is None else _digest(user)
+        if user is not None:
+            records = [r for r in records if r[1] in (user_digest, unknown)]
+        if not records:
+            return None, None
+        record = max(records, key=lambda r: (r[1] == user_digest, r[2]))
+        found_server, found_user, session = _decode_payload(contents, record)
+        if session is None or (server is not None and found_server not in (server, '')) or (
+                user is not None and found_user not in (user, '')):
+            return _find_session(_read_cache_file(file_path), server, user)  # Hash collision or invalid payload.
+        return found_user, session
+    except ValueError:
+        return None, None
+    finally:
+        contents.close()
+
+
+def _load_session(file_path, server=None, user=None):
+    """Read cached cookies and the time they were last validated from file. Filters out everything but JSESSIONID.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+
+    Keyword arguments:
+    server -- JIRA server URL the session belongs to. None for the most recently saved session of any server.
+    user -- username the session belongs to. None for the most recently saved session of any user.
+
+    Returns:
+    Tuple: dict of cookies restored from file (otherwise an empty dict) and the Unix timestamp of the last successful
+    validation of those cookies (None if unknown).
+    """
+    entry = _lookup_session(file_path, server, user)[1]
+    if entry is None:
+        return dict(), None
+    return dict(JSESSIONID=entry['JSESSIONID']), entry['validated']
+
+
+def _load_cookies(file_path):
+    """Read cached cookies from file. Filters out everything but JSESSIONID.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+
+    Returns:
+    Dict of cookies restored from file. Otherwise returns an empty dict.
+    """
+    return _load_session(file_path)[0]
+
+
+@contextmanager
+def _locked(file_path):
+    """Hold an exclusive advisory lock on file_path while it's being rewritten. Blocks until the lock is acquired.
+
+    The lock is taken with fcntl.flock() on a separate "file_path.lock" file, which is never deleted (deleting it would
+    let two processes lock different files). No-op on platforms without fcntl.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+    """
+    if fcntl is None:
+        yield
+        return
+    old_mask = os.umask(0o077)
+    try:
+        fd = os.open(file_path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    finally:
+        os.umask(old_mask)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Also releases the lock.
+
+
+def _merge_sessions(cache, updates):
+    """Apply saved/removed sessions to a dict returned by _read_cache().
+
+    Positional arguments:
+    cache -- dict returned by _read_cache(). Modified in place.
+    updates -- dict of {(server URL, username): session dict, or None to remove the session}.
+    """
+    for (server, user), session in updates.items():
+        if server:
+            cache.pop('', None)  # Migrated session cached by an older version.
+        if session:
+            cache.setdefault(server, dict())[user] = session
+        elif server in cache:
+            cache[server].pop(user, None)
+            if not cache[server]:
+                del cache[server]
+
+
+def _write_sessions(file_path, updates, sync=True):
+    """Merge sessions into the cookie cache file and rewrite it.
+
+    The file is locked while it's being merged and rewritten, so concurrent processes don't lose each other's sessions.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+    updates -- dict of {(server URL, username): session dict, or None to remove the session}.
+
+    Keyword arguments:
+    sync -- flush the file to disk with fdatasync() before replacing the old one.
+    """
+    with _locked(file_path):
+        # Merge updates into existing sessions.
+        cache = _read_cache_file(file_path)
+        _merge_sessions(cache, updates)
+
+        # Write file.
+        _write_atomically(file_path, _encode_cache(cache), sync)
+
+
+def _flush_pending_saves():
+    """Write sessions saved with the write-behind durability policy. Registered with atexit.
+
+    Every session saved to the same file since the last flush is written with a single locked rewrite.
+    """
+    with _PENDING_SAVES_LOCK:
+        pending = dict(_PENDING_SAVES)
+        _PENDING_SAVES.clear()
+    for file_path, updates in pending.items():
+        _write_sessions(file_path, updates)
+
+
+atexit.register(_flush_pending_saves)
+
+
+def _write_atomically(file_path, contents, sync=True):
+    """Write contents to a temporary file in the same directory, then rename it over file_path.
+
+    Readers either see the old file or the new one, never a missing or partially written file. The new file is only
+    readable by the current user.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+    contents -- bytes to write.
+
+    Keyword arguments:
+    sync -- flush the temporary file to disk with fdatasync() before renaming it.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.{0}.'.format(os.path.basename(file_path)), dir=directory)  # Mode 0600.
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contents)
+            f.flush()
+            if sync and hasattr(os, 'fdatasync'):
+                os.fdatasync(f.fileno())  # Linux only.
+        _REPLACE(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _save_cookies(file_path, dict_object, validated=None, server=None, user=None, expires=None, durability='always',
+                  server_info=None, server_info_saved=None):
+    """Cache cookies dictionary to file. Filters out everything but JSESSIONID.
+
+    Sessions of other servers and users already in the file are kept. Expired sessions are dropped.
+
+    Positional arguments:
+    file_path -- string representing the file path to where cookie data is to be stored on disk.
+    dict_object -- dict containing the current JIRA session via JIRA()._session.cookies.get_dict().
+
+    Keyword arguments:
+    validated -- Unix timestamp of the last time the JIRA server accepted these cookies. Stored next to the cookie.
+    server -- JIRA server URL the session belongs to.
+    user -- username the session belongs to.
+    expires -- Unix timestamp after which the session is discarded. None if it never expires.
+    durability -- 'always' writes the file and waits for it to reach the disk (fdatasync). 'never' writes the file
+        without syncing. 'write-behind' keeps the session in memory (visible to _read_cache() in this process) and
+        writes every pending session once, at interpreter exit.
+    server_info -- dict returned by jira.client.JIRA.server_info(), cached with the session.
+    server_info_saved -- Unix timestamp of when server_info was fetched from the JIRA server.
+    """
+    if durability not in ('always', 'never', 'write-behind'):
+        raise ValueError('Unknown durability policy: {0}'.format(durability))
+    sanitized = dict((k, v) for k, v in dict_object.items() if k == 'JSESSIONID' and str(v).isalnum())
+    session = None
+    if sanitized:
+        session = dict(JSESSIONID=sanitized['JSESSIONID'], validated=validated, expires=expires, saved=time.time())
+        if server_info is not None and server_info_saved is not None:
+            session.update(server_info=server_info, server_info_saved=server_info_saved)
+    updates = {(server or '', user or ''): session}
+
+    if durability == 'write-behind':
+        with _PENDING_SAVES_LOCK:
+            _PENDING_SAVES.setdefault(file_path, dict()).update(updates)
+        return
+    _write_sessions(file_path, updates, durability == 'always')
+
+
+def _server_url(args, kwargs, default):
+    """Return the JIRA server URL jira.client.JIRA.__init__() will connect to.
+
+    Positional arguments:
+    args -- tuple of positional arguments (server, options, etc.).
+    kwargs -- dict of keyword arguments (server, options, etc.).
+    default -- server URL in jira.client.JIRA.DEFAULT_OPTIONS.
+
+    Returns:
+    Server URL string without a trailing slash.
+    """
+    server = kwargs.get('server', args[0] if args else None)
+    options = kwargs.get('options', args[1] if len(args) > 1 else None)
+    if hasattr(server, 'keys'):
+        server, options = None, server  # Old API usage: JIRA(options_dict).
+    return (server or (options or dict()).get('server') or default).rstrip('/')
+
+
+class _SessionPool(object):
+    """Process-wide pool of authenticated clients, shared between JIRA instances.
+
+    Each entry holds the attributes set by jira.client.JIRA.__init__() (including the requests.Session and its
+    connection pool) of a client that was successfully authenticated, so other JIRA instances with the same key can
+    adopt it without re-constructing the client or validating the session again.
+    """
+
+    def __init__(self):
+        self._entries = dict()  # Key: [last used timestamp, last used tick, client state dict].
+        self._lock = threading.Lock()
+        self._ticks = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, key, session=None):
+        """Remove an entry from the pool.
+
+        Positional arguments:
+        key -- pool key from _pool_key().
+
+        Keyword arguments:
+        session -- only remove the entry if it still holds this requests.Session instance.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (session is None or entry[2].get('_session') is session):
+                del self._entries[key]
+
+    def get(self, key, max_idle=None):
+        """Check out a client state from the pool.
+
+        Positional arguments:
+        key -- pool key from _pool_key().
+
+        Keyword arguments:
+        max_idle -- entries unused for more than this many seconds are evicted instead of returned.
+
+        Returns:
+        Dict of client attributes, or None if there is no usable entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if max_idle and now - entry[0] > max_idle:
+                del self._entries[key]
+                return None
+            entry[0], entry[1] = now, next(self._ticks)
+            return entry[2]
+
+    def put(self, key, state, max_size):
+        """Add a client state to the pool, evicting the least recently used entries beyond max_size.
+
+        Positional arguments:
+        key -- pool key from _pool_key().
+        state -- dict of client attributes.
+        max_size -- maximum number of entries in the pool. Nothing is stored if this is 0.
+        """
+        if max_size < 1:
+            return
+        with self._lock:
+            self._entries[key] = [time.time(), next(self._ticks), state]
+            while len(self._entries) > max_size:
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+
+
+_SESSION_POOL = _SessionPool()
+
+
+def _pool_key(args, kwargs, user):
+    """Build a hashable session pool key from the arguments passed to jira.client.JIRA.__init__().
+
+    Positional arguments:
+    args -- tuple of positional arguments (server, options, etc.).
+    kwargs -- dict of keyword arguments (server, options, etc.).
+    user -- username the session belongs to (JIRA.FORCE_USER), None if the user was prompted.
+
+    Returns:
+    String uniquely identifying the (server, user, options) combination.
+    """
+    return json.dumps([args, kwargs, user], sort_keys=True, default=repr)
+
+
+class _ResponseDispatcher(object):
+    """requests response hook of authenticated sessions, calls JIRA.__check_response() of the session's owner.
+
+    Pooled sessions are shared by JIRA instances, the owner is the instance which last authenticated or adopted the
+    session. That way a HTTP 401 response re-authenticates (and replaces the session of) the instance using it, not the
+    one which created it. Owners are weakly referenced so pooled sessions don't keep them alive.
+    """
+
+    def __init__(self, owner):
+        """Constructor.
+
+        Positional arguments:
+        owner -- JIRA instance.
+        """
+        self.owner = weakref.ref(owner)
+
+    def __call__(self, response, *args, **kwargs):
+        """Pass the response to the owner's __check_response(), returns what it returns."""
+        owner = self.owner()
+        if owner is None:
+            return None
+        return owner._JIRA__check_response(response, *args, **kwargs)  # pylint: disable=protected-access
+
+
+def _discard_on_401(key, session):
+    """Return a requests response hook which drops a session pool entry when the server returns HTTP 401.
+
+    Positional arguments:
+    key -- pool key from _pool_key().
+    session -- requests.Session instance the hook is registered on.
+
+    Returns:
+    Function to be appended to session.hooks['response'].
+    """
+    def hook(response, *_, **__):
+        if response.status_code == 401:
+            _SESSION_POOL.discard(key, session)
+    return hook
+
+
+class _SharedAdapter(object):
+    """requests transport adapter shared by the sessions of every JIRA instance connecting to the same host.
+
+    Wraps a requests.adapters.HTTPAdapter. jira.client.JIRA closes its requests.Session (and so its adapters) when
+    garbage collected. This adapter outlives the sessions it's mounted on so its keep-alive connections (and their TLS
+    sessions) are reused by the next instance instead of connecting and doing a TLS handshake again.
+    """
+
+    def __init__(self, pool_size):
+        """Constructor.
+
+        Positional arguments:
+        pool_size -- maximum number of idle connections kept open for reuse.
+        """
+        self.adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+
+    def close(self):
+        """Keep the pooled connections open for other sessions."""
+        pass
+
+    def send(self, request, **kwargs):
+        """Send a request over a pooled connection, see requests.adapters.HTTPAdapter.send()."""
+        return self.adapter.send(request, **kwargs)
+
+
+_SHARED_ADAPTERS = dict()  # (scheme, host, pool size, process ID): _SharedAdapter, see _shared_adapter().
+_SHARED_ADAPTERS_LOCK = threading.Lock()
+
+
+def _shared_adapter(url, pool_size):
+    """Return the adapter shared by all sessions connecting to the URL's host, created if missing.
+
+    Positional arguments:
+    url -- JIRA server URL.
+    pool_size -- maximum number of idle connections to the host kept open for reuse.
+
+    Returns:
+    Tuple, the prefix to mount the adapter on (scheme and host) and the _SharedAdapter instance.
+    """
+    parsed = requests.compat.urlparse(url)
+    key = (parsed.scheme.lower(), parsed.netloc.lower(), pool_size, os.getpid())  # Forked children don't share sockets.
+    with _SHARED_ADAPTERS_LOCK:
+        adapter = _SHARED_ADAPTERS.get(key)
+        if adapter is None:
+            adapter = _SHARED_ADAPTERS[key] = _SharedAdapter(pool_size)
+    return '{0}://{1}/'.format(*key[:2]), adapter
+
+
+def _take_token(state, now, rate, burst):
+    """Take one token from a token bucket.
+
+    Positional arguments:
+    state -- dict with tokens (float), stamp (when tokens was last refilled), and paused_until (seconds since the epoch,
+        set from Retry-After headers). Modified in place.
+    now -- current time in seconds since the epoch.
+    rate -- tokens added per second, 0 for no limit.
+    burst -- maximum number of tokens in the bucket.
+
+    Returns:
+    0 if a token was taken, otherwise the number of seconds to wait before trying again.
+    """
+    if now < state['paused_until']:
+        return state['paused_until'] - now
+    if not rate:
+        return 0
+    state['tokens'] = min(float(burst), state['tokens'] + max(0.0, now - state['stamp']) * rate)
+    state['stamp'] = now
+    if state['tokens'] >= 1:
+        state['tokens'] -= 1
+        return 0
+    return (1 - state['tokens']) / rate
+
+
+class _RateLimiter(object):
+    """Client-side rate limiter of the requests sent to one JIRA server, see JIRA.RATE_LIMIT.
+
+    Combines a token bucket (requests per second, with bursts) with a concurrency window (requests in flight) adapted
+    with AIMD: every successful response widens the window by 1/window (one request per window's worth of responses),
+    an HTTP 429 or 503 response halves it. Only responses to requests sent after the last decrease can decrease it
+    again, so a burst of rejections halves it once. A Retry-After header in those responses pauses every request until
+    then. With a file path the token bucket and the pause are kept in that file (under an fcntl lock) and shared by
+    every process using it, the concurrency window is per process.
+    """
+
+    def __init__(self, rate, burst, concurrency, file_path=None):
+        """Constructor.
+
+        Positional arguments:
+        rate -- requests per second, 0 for no limit.
+        burst -- maximum number of requests sent at once after being idle.
+        concurrency -- maximum number of requests in flight, 0 for no limit.
+
+        Keyword arguments:
+        file_path -- file holding the token bucket shared with other processes, None to keep it in memory.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.concurrency = concurrency
+        self.file_path = file_path
+        self.condition = threading.Condition(threading.Lock())
+        self.lock = threading.Lock()
+        self.state = dict(tokens=float(self.burst), stamp=time.time(), paused_until=0.0)
+        self.window = float(concurrency)
+        self.in_flight = 0
+        self.decreased_at = 0.0
+
+    def acquire(self):
+        """Block until a request may be sent (a slot in the concurrency window and a token are available).
+
+        Returns:
+        Time the request was allowed in seconds since the epoch, to be passed to release().
+        """
+        if self.concurrency:
+            with self.condition:
+                while self.in_flight >= int(self.window):
+                    self.condition.wait()
+                self.in_flight += 1
+        try:
+            while True:
+                delay = self.update(lambda state, now: _take_token(state, now, self.rate, self.burst))
+                if delay <= 0:
+                    return time.time()
+                time.sleep(delay)
+        except BaseException:  # E.g. OSError locking the shared file or KeyboardInterrupt while sleeping.
+            self.release(0.0, None)  # Free the slot, it would be leaked otherwise.
+            raise
+
+    def release(self, started, response):
+        """Free the request's slot in the concurrency window and adapt the window to the response.
+
+        Positional arguments:
+        started -- value returned by acquire().
+        response -- requests.Response instance, None if the request failed without a response.
+        """
+        throttled = response is not None and response.status_code in _BACKOFF_STATUS_CODES
+        if self.concurrency:
+            with self.condition:
+                self.in_flight -= 1
+                if throttled and started >= self.decreased_at:
+                    self.window, self.decreased_at = max(1.0, self.window / 2), time.time()
+                elif response is not None and not throttled:
+                    self.window = min(float(self.concurrency), self.window + 1 / self.window)
+                self.condition.notify_all()
+        retry_after = _retry_after(response.headers) if throttled else None
+        if retry_after:
+            paused_until = time.time() + retry_after
+            self.update(lambda state, _: state.update(paused_until=max(state['paused_until'], paused_until)))
+
+    def update(self, function):
+        """Call function(state, now) with the token bucket state dict, then save the state.
+
+        Positional arguments:
+        function -- callable modifying the state dict in place.
+
+        Returns:
+        The function's return value.
+        """
+        with self.lock:
+            if not self.file_path:
+                return function(self.state, time.time())
+            with _locked(self.file_path):
+                try:
+                    with open(self.file_path) as f:
+                        state = dict(self.state)
+                        state.update(json.load(f))
+                except (IOError, OSError, ValueError, TypeError):
+                    state = dict(self.state)  # Missing or corrupt, start with a full bucket.
+                result = function(state, time.time())
+                old_mask = os.umask(0o077)
+                try:
+                    with open(self.file_path, 'w') as f:
+                        json.dump(state, f)
+                finally:
+                    os.umask(old_mask)
+            return result
+
+
+class _RateLimitedAdapter(object):
+    """requests transport adapter which sends requests through a _RateLimiter."""
+
+    def __init__(self, adapter, limiter):
+        """Constructor.
+
+        Positional arguments:
+        adapter -- requests transport adapter which sends the requests.
+        limiter -- _RateLimiter instance, shared by every JIRA instance of this process using the same JIRA server.
+        """
+        self.adapter = adapter
+        self.limiter = limiter
+
+    def close(self):
+        """Close the wrapped adapter."""
+        self.adapter.close()
+
+    def send(self, request, **kwargs):
+        """Wait for the rate limiter, then send the request, see requests.adapters.HTTPAdapter.send()."""
+        started, response = self.limiter.acquire(), None
+        try:
+            response = self.adapter.send(request, **kwargs)
+            return response
+        finally:
+            self.limiter.release(started, response)
+
+
+_RATE_LIMITERS = dict()  # (server URL, rate, burst, concurrency, file path, process ID): _RateLimiter.
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def _rate_limiter(server, rate, burst, concurrency, file_path):
+    """Return the _RateLimiter shared by JIRA instances of this process with the same settings, created if missing.
+
+    Positional arguments:
+    server -- JIRA server URL.
+    rate -- requests per second, 0 for no limit.
+    burst -- maximum number of requests sent at once after being idle.
+    concurrency -- maximum number of requests in flight, 0 for no limit.
+    file_path -- file shared with other processes, None to keep the token bucket in memory.
+
+    Returns:
+    _RateLimiter instance.
+    """
+    key = (server, rate, burst, concurrency, file_path, os.getpid())  # Forked children get their own window.
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(key)
+        if limiter is None:
+            limiter = _RATE_LIMITERS[key] = _RateLimiter(rate, burst, concurrency, file_path)
+    return limiter
+
+
+def _jql_string(value):
+    """Return a value quoted as a JQL string literal."""
+    return u'"{0}"'.format(value.replace(u'\\', u'\\\\').replace(u'"', u'\\"'))
+
+
+def _unique(values):
+    """Yield values in order, skipping the ones yielded before."""
+    seen = set()
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            yield value
+
+
+def _project(value, path, interned):
+    """Return the value at a path of an issue's JSON fields, sharing equal strings between issues.
+
+    Lists along the path (e.g. components) are projected item by item into tuples.
+
+    Positional arguments:
+    value -- decoded JSON (the issue's fields dict at first).
+    path -- tuple of keys, e.g. ('status', 'name').
+    interned -- dict of strings already seen, so equal values (e.g. status names) are stored once.
+
+    Returns:
+    The projected value, None if missing.
+    """
+    for i, name in enumerate(path):
+        if isinstance(value, list):
+            return tuple(_project(v, path[i:], interned) for v in value)
+        value = value.get(name) if isinstance(value, dict) else None
+    if isinstance(value, list):
+        return tuple(_project(v, (), interned) for v in value)
+    if isinstance(value, _TEXT):
+        return interned.setdefault(value, value)
+    return value
+
+
+def _retry_after(headers):
+    """Return the Retry-After response header in seconds (float), None if missing or not a number of seconds."""
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(error, attempt, base):
+    """Return how many seconds to wait before retrying a request the JIRA server rejected with HTTP 429.
+
+    Positional arguments:
+    error -- JIRAError raised by the request. Its Retry-After response header (in seconds) is honored if present.
+    attempt -- number of retries so far (0 for the first one).
+    base -- seconds to wait before the first retry without Retry-After, doubled for every subsequent retry.
+
+    Returns:
+    Number of seconds (float).
+    """
+    response = getattr(error, 'response', None)
+    retry_after = _retry_after(getattr(response, 'headers', None) or dict())
+    return base * 2.0 ** attempt if retry_after is None else retry_after
+
+
+def _prefetch(iterable, depth):
+    """Iterate over `iterable` in a background thread, keeping at most `depth` items buffered ahead of the consumer.
+
+    The background thread stops (after the item it's currently producing) when the returned generator is closed or
+    garbage collected. Exceptions raised by `iterable` are raised by the returned generator.
+
+    Positional arguments:
+    iterable -- iterable to consume in the background thread.
+    depth -- maximum number of buffered items, must be 1 or more.
+
+    Yields:
+    Items of `iterable` in order.
+    """
+    buffered = Queue(depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffered.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((None, item)):
+                    return
+        except Exception as e:  # pylint: disable=broad-except
+            put((e, None))
+            return
+        put((None, done))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            error, item = buffered.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+class _ResponseCache(object):
+    """requests transport adapter which caches GET responses of the JIRA server on disk, see JIRA.RESPONSE_CACHE_TTLS.
+
+    Wraps the adapter previously mounted for the JIRA server URL. Every response is stored in its own file, named after
+    a hash of the server URL, username, and request URL so one user's responses are never served to another user.
+    Fresh responses (younger than their TTL) are served without any HTTP request. Stale responses with an ETag or
+    Last-Modified header are revalidated with a conditional request, an HTTP 304 response renews them. When the files
+    add up to more than max_size bytes the least recently used ones are deleted.
+    """
+
+    def __init__(self, adapter, directory, namespace, ttls, max_size):
+        """Constructor.
+
+        Positional arguments:
+        adapter -- requests transport adapter which sends requests not served from the cache.
+        directory -- directory where responses are stored, created if missing.
+        namespace -- list with server URL and username, hashed into file names.
+        ttls -- dict of regex patterns (searched in the URL path) and the number of seconds matching responses are
+            fresh. If more than one pattern matches the lowest TTL is used.
+        max_size -- maximum total size of the cache directory in bytes.
+        """
+        super(_ResponseCache, self).__init__()
+        self.adapter = adapter
+        self.directory = directory
+        self.namespace = namespace
+        self.ttls = ttls
+        self.max_size = max_size
+
+    def close(self):
+        """Close the wrapped adapter."""
+        self.adapter.close()
+
+    def send(self, request, **kwargs):
+        """Serve a GET request from the cache, revalidate it, or send it and cache the response.
+
+        Positional arguments:
+        request -- requests.PreparedRequest instance.
+
+        Keyword arguments:
+        kwargs -- passed to the wrapped adapter's send() (e.g. stream, timeout, verify).
+
+        Returns:
+        requests.Response instance.
+        """
+        ttl = self.ttl(request)
+        if ttl is None:
+            return self.adapter.send(request, **kwargs)
+        file_path = os.path.join(self.directory, hashlib.sha1(json.dumps(self.namespace + [request.url]).encode(
+            'utf-8')).hexdigest() + '.json')
+        entry = self.read(file_path)
+        if entry and 0 <= time.time() - entry['stored'] < ttl:
+            try:
+                os.utime(file_path, None)  # Most recently used.
+            except OSError:
+                pass  # Evicted by another process since it was read, the entry read is still valid.
+            response = self.build(request, entry)
+            response.from_cache = True  # The JIRA server wasn't contacted.
+            return response
+
+        # Missing or stale. Revalidate if possible.
+        if entry and entry.get('etag'):
+            request.headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            request.headers['If-Modified-Since'] = entry['last_modified']
+        response = self.adapter.send(request, **kwargs)
+        if entry and response.status_code == 304:
+            response.close()
+            entry['stored'] = time.time()
+            self.write(file_path, dict((k, v) for k, v in entry.items() if k != 'content'))
+            return self.build(request, entry)
+        if response.status_code == 200:
+            self.write(file_path, dict(
+                body=base64.b64encode(response.content).decode('ascii'), etag=response.headers.get('ETag'),
+                headers=dict((k, v) for k, v in response.headers.items() if k.lower() not in _UNCACHED_HEADERS),
+                last_modified=response.headers.get('Last-Modified'), stored=time.time(), url=request.url,
+            ))
+        return response
+
+    def ttl(self, request):
+        """Return the TTL (seconds) of responses to request, None if it isn't to be cached.
+
+        Positional arguments:
+        request -- requests.PreparedRequest instance.
+        """
+        if request.method != 'GET':
+            return None
+        path = requests.compat.urlparse(request.url).path
+        ttls = [t for p, t in self.ttls.items() if re.search(p, path)]
+        return min(ttls) if ttls else None
+
+    def build(self, request, entry):
+        """Return a requests.Response instance of a cached response.
+
+        Positional arguments:
+        request -- requests.PreparedRequest instance.
+        entry -- dict returned by read().
+        """
+        response = requests.models.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = requests.structures.CaseInsensitiveDict(entry['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = entry['content']  # pylint: disable=protected-access
+        response.url = entry['url']
+        response.request = request
+        response.connection = self
+        return response
+
+    @staticmethod
+    def read(file_path):
+        """Read a cached response from disk.
+
+        Positional arguments:
+        file_path -- file path of the response.
+
+        Returns:
+        Dict written by write() plus the decoded body under the content key. None if missing or invalid.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                entry = json.loads(f.read().decode('ascii'))
+            entry['content'] = base64.b64decode(entry['body'].encode('ascii'))
+            if not isinstance(entry['headers'], dict) or _number(entry['stored']) is None:
+                return None
+        except (AttributeError, IOError, KeyError, OSError, TypeError, ValueError):
+            return None
+        return entry
+
+    def write(self, file_path, entry):
+        """Store a response and delete the least recently used ones if the cache directory is too big.
+
+        Positional arguments:
+        file_path -- file path of the response.
+        entry -- dict with body (base64), etag, headers, last_modified, stored, and url keys.
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory, 0o700)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+        data = json.dumps(entry).encode('ascii')
+        try:
+            replaced = os.path.getsize(file_path)
+        except OSError:
+            replaced = 0
+        _write_atomically(file_path, data, sync=False)
+
+        # Scanning the directory costs a stat() per cached response, only do it when the tracked total is too big.
+        with _RESPONSE_CACHE_SIZES_LOCK:
+            total = _RESPONSE_CACHE_SIZES.get(self.directory)
+            if total is not None:
+                total = _RESPONSE_CACHE_SIZES[self.directory] = total + len(data) - replaced
+        if total is None or total > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently used responses until the cache directory is below 90% of max_size.
+
+        Leaving some room means the directory is scanned again after about a tenth of max_size was written, not after
+        every write. The total is tracked per process from then on, so responses written by other processes are only
+        accounted for by the next scan.
+        """
+        files = list()
+        for name in os.listdir(self.directory):
+            if name.startswith('.') or not name.endswith('.json'):
+                continue  # Temporary file being written by _write_atomically().
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue  # Deleted by another process.
+            files.append((stat.st_mtime, name, stat.st_size))
+        total = sum(f[2] for f in files)
+        for _, name, size in sorted(files):
+            if total <= self.max_size * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+        with _RESPONSE_CACHE_SIZES_LOCK:
+            _RESPONSE_CACHE_SIZES[self.directory] = total
+
+
+_RESPONSE_CACHE_SIZES = dict()  # Response cache directory: total size of its files, see _ResponseCache.write().
+_RESPONSE_CACHE_SIZES_LOCK = threading.Lock()
+
+
+def _jira_timestamp(value):
+    """Convert a JIRA date and time (e.g. '2014-06-01T12:34:56.000+0200') to seconds since the epoch.
+
+    Positional arguments:
+    value -- string from an issue's created or updated field.
+
+    Returns:
+    Float, None if value isn't a JIRA date and time.
+    """
+    match = re.match(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(\.\d+)?([+-])(\d\d):?(\d\d)$', value or '')
+    if not match:
+        return None
+    groups = match.groups()
+    offset = (int(groups[8]) * 3600 + int(groups[9]) * 60) * (-1 if groups[7] == '-' else 1)
+    return calendar.timegm(tuple(int(g) for g in groups[:6])) + float(groups[6] or 0) - offset
+
+
+class _IssueStore(object):
+    """SQLite database of issues, shared by every server and user (kept apart by their rows).
+
+    Holds the issues (as JSON) with their key, project key, status name, assignee name, and updated time in indexed
+    columns for local queries, and, per JQL query synced by JIRA.sync(), the high-water mark: the latest `updated` time
+    of the issues fetched. A connection is opened for each operation, SQLite's locking serializes writes of concurrent
+    processes. Databases with another schema version are emptied, the next sync then fetches everything again.
+    """
+
+    def __init__(self, file_path, server, user):
+        """Constructor.
+
+        Positional arguments:
+        file_path -- path to the SQLite database, created if missing.
+        server -- JIRA server URL.
+        user -- username, '' if unknown.
+        """
+        self.file_path = file_path
+        self.server = server
+        self.user = user
+
+    @contextmanager
+    def connect(self):
+        """Context manager yielding a sqlite3 connection to the database with the current schema. Commits on exit."""
+        import sqlite3  # Imported on first use.
+        old_mask = os.umask(0o077)  # Holds full issues, private like the cookie cache.
+        try:
+            connection = sqlite3.connect(self.file_path, timeout=60)
+        finally:
+            os.umask(old_mask)
+        try:
+            if connection.execute('PRAGMA user_version').fetchone()[0] != _STORE_VERSION:
+                # sqlite3 runs DDL outside of transactions, take the write lock explicitly and check again under it.
+                connection.isolation_level = None
+                connection.execute('BEGIN IMMEDIATE')
+                try:
+                    if connection.execute('PRAGMA user_version').fetchone()[0] != _STORE_VERSION:
+                        for statement in _STORE_SCHEMA:
+                            connection.execute(statement)
+                        connection.execute('PRAGMA user_version = {0}'.format(_STORE_VERSION))
+                    connection.execute('COMMIT')
+                except BaseException:
+                    connection.execute('ROLLBACK')
+                    raise
+                connection.isolation_level = ''
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def high_water(self, jql):
+        """Return the high-water mark of a JQL query (seconds since the epoch), None if it was never synced.
+
+        Positional arguments:
+        jql -- JQL query string as passed to JIRA.sync().
+        """
+        with self.connect() as connection:
+            row = connection.execute('SELECT high_water FROM syncs WHERE server = ? AND user = ? AND jql = ?',
+                                     (self.server, self.user, jql)).fetchone()
+        return row[0] if row else None
+
+    def put(self, issues):
+        """Insert or update issues in one transaction.
+
+        Issues are versioned by their `updated` field: an issue older than the stored one is ignored, one with the same
+        `updated` time has its fields added to the stored ones (searches may have requested different fields), a newer
+        one replaces it. Issues without an `updated` field can't be versioned and aren't stored.
+
+        Positional arguments:
+        issues -- list of issue dicts (decoded JSON of the JIRA server's search results).
+
+        Returns:
+        Latest `updated` time of the issues in seconds since the epoch, None if none had one.
+        """
+        versions = dict()
+        for issue in issues:
+            updated = _jira_timestamp((issue.get('fields') or dict()).get('updated'))
+            if updated is not None and updated >= versions.get(issue['key'], (updated, None))[0]:
+                versions[issue['key']] = (updated, issue)
+        if not versions:
+            return None
+        keys = list(versions)
+        with self.connect() as connection:
+            stored = dict()
+            for i in range(0, len(keys), _STORE_CHUNK_SIZE):
+                chunk = keys[i:i + _STORE_CHUNK_SIZE]
+                stored.update((r[0], (r[1], r[2])) for r in connection.execute(
+                    'SELECT key, updated, json FROM issues WHERE server = ? AND user = ? AND key IN ({0})'.format(
+                        ', '.join('?' * len(chunk))), [self.server, self.user] + chunk))
+            rows = list()
+            for key, (updated, issue) in versions.items():
+                old_updated, old_json = stored.get(key, (None, None))
+                if old_updated is not None and updated < old_updated:
+                    continue
+                if old_updated == updated:
+                    merged = json.loads(old_json)
+                    fields = merged.get('fields') or dict()
+                    fields.update(issue['fields'])
+                    merged.update(issue)
+                    merged['fields'] = fields
+                    issue = merged
+                fields = issue['fields']
+                columns = [(fields.get('project') or dict()).get('key'), (fields.get('status') or dict()).get('name')]
+                assignee = fields.get('assignee') or dict()
+                columns.append(assignee.get('name') or assignee.get('accountId'))  # accountId on JIRA Cloud.
+                rows.append([self.server, self.user, key] + columns + [updated, json.dumps(issue)])
+            connection.executemany('INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return max(v[0] for v in versions.values())
+
+    def merge(self, jql, issues, batch_size, write=True):
+        """Store issues, then move the JQL query's high-water mark to the latest `updated` time seen.
+
+        Issues are written `batch_size` at a time while the iterable is consumed, so the database isn't locked while
+        waiting for the JIRA server. The high-water mark only moves once every issue is consumed.
+
+        Positional arguments:
+        jql -- JQL query string as passed to JIRA.sync().
+        issues -- iterable of issue dicts (decoded JSON of the JIRA server's search results).
+        batch_size -- number of issues written per transaction.
+
+        Keyword arguments:
+        write -- False if the issues were already stored (see JIRA.ISSUE_STORE), only the high-water mark is updated.
+
+        Returns:
+        Number of issues consumed.
+        """
+        high_water, count = self.high_water(jql), 0
+        for batch in iter(lambda: list(itertools.islice(issues, batch_size)), list()):
+            if write:
+                updated = self.put(batch)
+            else:
+                stamps = [_jira_timestamp((i.get('fields') or dict()).get('updated')) for i in batch]
+                updated = max([t for t in stamps if t is not None] or [None])
+            if updated is not None and (high_water is None or updated > high_water):
+                high_water = updated
+            count += len(batch)
+        with self.connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?, ?)',
+                               (self.server, self.user, jql, high_water, time.time()))
+        return count
+
+    def find(self, keys=None, updated_since=None, **columns):
+        """Return stored issues matching every given filter as a list of dicts, ordered by key.
+
+        Keyword arguments:
+        keys -- list of issue keys.
+        updated_since -- seconds since the epoch, only issues updated at or after this time.
+        columns -- project, status, or assignee: a string or list of strings (any of them matches).
+
+        Returns:
+        List of issue dicts.
+        """
+        where, params = ['server = ?', 'user = ?'], [self.server, self.user]
+        for name in _STORE_COLUMNS:
+            value = columns.pop(name, None)
+            if value is None:
+                continue
+            values = [value] if isinstance(value, (str, _TEXT)) else list(value)
+            where.append('{0} IN ({1})'.format(name, ', '.join('?' * len(values))))
+            params.extend(values)
+        if columns:
+            raise TypeError('Unknown column: {0}'.format(', '.join(sorted(columns))))
+        if updated_since is not None:
+            where.append('updated >= ?')
+            params.append(updated_since)
+        if keys is None:
+            chunks = [None]
+        else:
+            keys = list(_unique([keys] if isinstance(keys, (str, _TEXT)) else keys))
+            chunks = [keys[i:i + _STORE_CHUNK_SIZE] for i in range(0, len(keys), _STORE_CHUNK_SIZE)]
+        rows = list()
+        with self.connect() as connection:
+            for chunk in chunks:
+                clauses, values = list(where), list(params)
+                if chunk is not None:
+                    clauses.append('key IN ({0})'.format(', '.join('?' * len(chunk))))
+                    values.extend(chunk)
+                rows.extend(connection.execute('SELECT key, json FROM issues WHERE {0}'.format(' AND '.join(clauses)),
+                                               values))
+        return [json.loads(r[1]) for r in sorted(rows)]
+
+
+class _SingleFlight(object):
+    """Serializes authentication across threads and shares its outcome with the threads that waited for it.
+
+    Authentication of JIRA instances with the same session pool key (server, user, and options) happens one thread at a
+    time. When a thread authenticates successfully, its cookies are published so threads which loaded older (or no)
+    cookies before that can use them without validating or logging in again. Cookies rejected by the server are
+    remembered so other threads don't try them again.
+    """
+
+    def __init__(self):
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+        self._locks = dict()  # Key: threading.Lock held while authenticating.
+        self._rejected = dict()  # Key: set of JSESSIONIDs rejected by the server.
+        self._sessions = dict()  # Key: dict passed to publish() plus generation, of the last authentication.
 
+    def clear(self):
+        """Forget all published and rejected sessions."""
+        with self._lock:
+            self._locks.clear()
+            self._rejected.clear()
+            self._sessions.clear()
 
-def _load_cookies(file_path):
-    """Read cached cookies from file. Filters out everything but JSESSIONID.
+    def generation(self):
+        """Return a number lower than the generation of every session published from now on."""
+        with self._lock:
+            return next(self._generations)
 
-    Positional arguments:
-    file_path -- string representing the file path to where cookie data is to be stored on disk.
+    def lock(self, key):
+        """Return the threading.Lock to hold while authenticating.
 
-    Returns:
-    Dict of cookies restored from file. Otherwise returns an empty dict.
-    """
-    # Check file.
-    if not os.path.isfile(file_path) or not os.access(file_path, os.R_OK):
-        return dict()
+        Positional arguments:
+        key -- pool key from _pool_key().
+        """
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
 
-    # Read file.
-    with open(file_path, 'rb') as f:
-        contents = f.read(1024)
-    if not contents:
-        return dict()
+    def publish(self, key, session):
+        """Share a successfully authenticated session with other threads.
 
-    # Parse file.
-    try:
-        decoded = base64.b64decode(contents).decode('ascii')
-        parsed = json.loads(decoded)
-        sanitized = dict((k, v) for k, v in parsed.items() if k == 'JSESSIONID' and v.isalnum())
-    except (AttributeError, TypeError, ValueError):
-        return dict()
+        Positional arguments:
+        key -- pool key from _pool_key().
+        session -- dict with cookies, validated, user, expires, server_info, and server_info_saved keys.
+        """
+        with self._lock:
+            session = dict(session, generation=next(self._generations))
+            self._sessions[key] = session
+            return session['generation']
 
-    return sanitized
+    def newer(self, key, generation):
+        """Return the session published after `generation` was obtained.
 
+        Positional arguments:
+        key -- pool key from _pool_key().
+        generation -- value previously returned by generation() or publish().
 
-def _save_cookies(file_path, dict_object):
-    """Cache cookies dictionary to file. Filters out everything but JSESSIONID.
+        Returns:
+        Dict passed to publish() plus the generation key. None if there is no newer session.
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            return session if session and session['generation'] > generation else None
 
-    Positional arguments:
-    file_path -- string representing the file path to where cookie data is to be stored on disk.
-    dict_object -- dict containing the current JIRA session via JIRA()._session.cookies.get_dict().
-    """
-    # Encode dict_object.
-    sanitized = dict((k, v) for k, v in dict_object.items() if k == 'JSESSIONID' and str(v).isalnum())
-    json_string = json.dumps(sanitized)
-    encoded = base64.b64encode(json_string.encode('ascii'))
+    def reject(self, key, cookies):
+        """Remember cookies rejected by the server.
 
-    # Remove existing files.
-    try:
-        os.remove(file_path)
-    except OSError:
-        pass
+        Positional arguments:
+        key -- pool key from _pool_key().
+        cookies -- dict of cookies.
+        """
+        if cookies.get('JSESSIONID'):
+            with self._lock:
+                self._rejected.setdefault(key, set()).add(cookies['JSESSIONID'])
 
-    # Write file.
-    old_mask = os.umask(0o077)
-    with open(file_path, 'wb') as f:
-        f.seek(0)
-        f.truncate()
-        f.write(encoded)
-        f.flush()
-        if hasattr(os, 'fdatasync'):
-            os.fdatasync(f.fileno())  # Linux only.
-    os.umask(old_mask)
+    def rejected(self, key, cookies):
+        """Return True if the server rejected these cookies before.
+
+        Positional arguments:
+        key -- pool key from _pool_key().
+        cookies -- dict of cookies.
+        """
+        with self._lock:
+            return cookies.get('JSESSIONID') in self._rejected.get(key, ())
+
+
+_SINGLE_FLIGHT = _SingleFlight()
+_PROMPT_LOCK = threading.Lock()  # Keeps username and password prompts of different threads from interleaving.
 
 
 def _prompt(func, prompt):
@@ -93,20 +1497,180 @@ def _prompt(func, prompt):
     return func(prompt)
 
 
-class JIRA(jira.client.JIRA):
+def log_metric(kind, name, value):
+    """JIRA.METRICS_CALLBACK which logs every metric to the 'jira_context' logger with DEBUG level.
+
+    Positional arguments:
+    kind -- 'timer' or 'counter'.
+    name -- name of the phase or event.
+    value -- seconds for timers, increment for counters.
+    """
+    logging.getLogger('jira_context').debug('%s %s %s', kind, name, value)
+
+
+def install_session_token(token):
+    """Make JIRA instances of this process use a session token from JIRA.session_token() instead of the cache file.
+
+    Meant to be the initializer of multiprocessing.Pool or concurrent.futures.ProcessPoolExecutor, so child processes
+    reuse the parent process' login without reading the cookie cache file, validating the session, or prompting:
+    `ProcessPoolExecutor(initializer=install_session_token, initargs=(j.session_token(),))`. JIRA instances with the
+    same server URL (and FORCE_USER if set) trust the token's session. It's validated by their first API call.
+
+    Positional arguments:
+    token -- dict returned by JIRA.session_token().
+    """
+    try:
+        session = _sanitize_session(token)
+        server, user = token['server'], token['user'] or ''
+    except (AttributeError, KeyError, TypeError):
+        session = None
+    if session is None:
+        raise ValueError('Invalid or expired session token.')
+    _SESSION_TOKENS.setdefault(server, dict())[user] = session
+
+
+class _LazyClientType(type):
+    """Metaclass of JIRA, imports jira.client when a class attribute inherited from it is first accessed."""
+
+    def __getattr__(cls, name):
+        """Import jira.client if a missing class attribute (e.g. DEFAULT_OPTIONS) is accessed, then look it up again.
+
+        Positional arguments:
+        name -- name of the attribute being accessed.
+        """
+        if name.startswith('__'):
+            raise AttributeError(name)
+        _import_client()
+        return type.__getattribute__(cls, name)
+
+
+_LazyClient = _LazyClientType('_LazyClient', (object,), dict(__doc__='JIRA base class until jira.client is imported.'))
+
+
+def _import_client():
+    """Import jira.client and requests, then make JIRA a jira.client.JIRA subclass. Does nothing the second time.
+
+    Importing them takes a while, so it's deferred until a JIRA instance is created or a class attribute inherited from
+    jira.client.JIRA is accessed. Applications which import this module but exit early never import them.
+    """
+    global jira, requests, JIRAError  # pylint: disable=global-statement,global-variable-undefined,invalid-name
+    with _IMPORT_LOCK:
+        if _LazyClient not in JIRA.__bases__:
+            return
+        import jira.client
+        import jira.exceptions
+        import jira.resources
+        import requests.adapters
+        import requests.compat
+        import requests.models
+        import requests.structures
+        import requests.utils
+        JIRAError = jira.exceptions.JIRAError
+        JIRA.__bases__ = (jira.client.JIRA,)
+
+
+def __getattr__(name):
+    """Module attributes not set yet (Python 3.7+): import jira.client if JIRAError is looked up before first use.
+
+    Positional arguments:
+    name -- name of the module attribute being accessed.
+    """
+    if name != 'JIRAError':
+        raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__, name))
+    _import_client()
+    return jira.exceptions.JIRAError
+
+
+class JIRA(_LazyClient):
     """jira.client.JIRA subclass, basically makes the original JIRA library context-aware.
 
+    jira.client (and requests) are imported when the first instance is created, so importing this module is fast.
+    Until then (or until a class attribute inherited from jira.client.JIRA is read) its base class is a placeholder,
+    so issubclass(JIRA, jira.client.JIRA) is False even if jira.client was imported elsewhere. Instances are always
+    jira.client.JIRA instances.
+
     Authentication happens not during instantiation but when the context is entered (using the `with` statement). Cookie
     caching only happens on context exit (after the `with` code block) if authentication was successful and a new cookie
     was returned by the JIRA server.
 
+    Authentication is thread safe and single-flight: when many threads enter a context for the same server and user at
+    once, only one of them validates the cached cookies or logs in. The others wait for it and reuse its session cookie.
+
     Class variables (persists until the application terminates):
     ABORTED_BY_USER -- False by default. Set to True if USER_CAN_ABORT is True and the user enters a blank username or
         password. If this variable is ever set to True, this class will never authenticate (both cookie or password
         methods).
-    COOKIE_CACHE_FILE_PATH -- file path to the cache file used to store the base64 encoded session cookie.
+    CONNECTION_POOL_SIZE -- maximum number of idle keep-alive connections kept open per JIRA server host. The connection
+        pool is shared by all JIRA instances (and password retries) in the process, so subsequent `with` blocks don't
+        connect and do a TLS handshake again. 0 disables sharing, every instance then opens its own connections.
+    COOKIE_CACHE_FILE_PATH -- file path to the cache file used to store the session cookies. One session is kept per
+        server URL and username, so switching between servers doesn't evict the other sessions. The file starts with a
+        versioned header and an index, so looking up a session doesn't decode the others. Files written by older
+        versions (base64 encoded JSON) are converted when read.
+    COOKIE_DURABILITY -- 'always' (default) waits for the cookie cache file to reach the disk (fdatasync) on every save.
+        'never' skips the fdatasync. 'write-behind' keeps saved sessions in memory (other JIRA instances in this process
+        still see them) and writes them all at once when the interpreter exits.
     FORCE_USER -- if set to a string, user won't be prompted for their username. Value of this variable will be used
         instead.
+    ISSUE_STORE -- if True, issues returned by search_many(), iter_issues(), iter_records(), and fetch_issues() are
+        also stored in the local issue store (see sync()), so find_issues() can answer later queries without contacting
+        the JIRA server. Issues are only stored if their `updated` field was fetched. False (default) only stores
+        issues fetched by sync() and find_issues().
+    KEEP_ALIVE_INTERVAL -- seconds. If set, a background thread sends a request whenever the session has been idle for
+        this long (until the context exits), so the JIRA server doesn't expire it. Set it below the JIRA server's
+        session timeout. 0 (default) disables the keep-alive thread.
+    LAZY_CONNECT -- if True, entering the context only loads cached cookies. Connecting, validating, and prompting for
+        credentials are deferred until the first attribute or method of the jira.client.JIRA parent class is accessed,
+        so code paths which never use the JIRA server cost nothing on the network. Until then ABORTED_BY_USER and
+        authentication_failed don't reflect the outcome of authentication.
+    METRICS_CALLBACK -- callable invoked with (kind, name, value) for instrumentation, e.g. to ship metrics to a
+        monitoring system. Timers (kind 'timer', value in seconds) measure the phases of authentication: 'enter' (the
+        whole __enter__()), 'load_cookies', 'lock_wait' (waiting for another thread authenticating), 'parent_init'
+        (jira.client.JIRA.__init__()), 'validate' (validating cached cookies), 'prompt' (waiting for the user to enter
+        credentials), 'login' (password login), and 'save_cookies'. Counters (kind 'counter', value 1) count events:
+        'cookie_hit' and 'cookie_miss' (cached session found or not), 'fallback_401' (cached cookies rejected by the
+        JIRA server), 'pool_hit' (client reused from the session pool), 'shared_session' (session of another thread
+        reused), and 'reauthentication' (authenticated again after an HTTP 401 response). It's called from the thread
+        doing the work and must not raise. Set it to log_metric to log them instead. None (default) disables
+        instrumentation.
+    RATE_LIMIT -- maximum requests per second sent to the JIRA server by all JIRA instances of this process (or of every
+        process, see RATE_LIMIT_SHARED), enforced with a token bucket. HTTP 429 and 503 responses with a Retry-After
+        header pause all of them until then. 0 (default) disables the limit.
+    RATE_LIMIT_BURST -- number of requests RATE_LIMIT lets through at once after being idle (token bucket size).
+    RATE_LIMIT_CONCURRENCY -- maximum number of requests in flight to the JIRA server from this process. The limit
+        adapts (AIMD): halved when the JIRA server responds with HTTP 429 or 503, raised by one per window's worth of
+        successful responses back up to this value. 0 (default) disables it.
+    RATE_LIMIT_SHARED -- if True, the RATE_LIMIT token bucket and Retry-After pauses are shared by every process using
+        the same COOKIE_CACHE_FILE_PATH, through a COOKIE_CACHE_FILE_PATH + '_rate_limit_*' file per server.
+    RESPONSE_CACHE_MAX_SIZE -- maximum total size in bytes of the response cache directory. When exceeded, least
+        recently used responses are deleted until it's below 90% of this.
+    RESPONSE_CACHE_TTLS -- dict of regex patterns and seconds, enables the on-disk cache of GET responses. Responses to
+        GET requests with a URL path matching a pattern (re.search(), e.g. '/serverInfo$' or '/issue/') are stored in
+        the COOKIE_CACHE_FILE_PATH + '_responses' directory, separately for every server and user, and served from there
+        for that many seconds without contacting the JIRA server. After that they are revalidated with If-None-Match or
+        If-Modified-Since when the JIRA server sent an ETag or Last-Modified header. None (default) disables the cache.
+    RETRY_ON_401 -- if True, an API call rejected with HTTP 401 (e.g. the session expired in a long running process)
+        authenticates again (prompting for credentials if allowed) and is retried once, instead of raising JIRAError.
+    SEARCH_BACKOFF -- seconds search_many() waits before retrying a search the JIRA server rejected with HTTP 429
+        (doubled for every subsequent retry). The server's Retry-After header takes precedence.
+    SEARCH_BATCH_SIZE -- default number of issue keys fetch_issues() looks up with one search.
+    SEARCH_PAGE_SIZE -- default number of issues iter_issues() requests per page.
+    SEARCH_PREFETCH -- default number of pages iter_issues() fetches ahead in a background thread.
+    SEARCH_RETRIES -- how many times search_many() retries one search rejected with HTTP 429 before raising.
+    SEARCH_WORKERS -- default number of threads search_many() runs searches in.
+    SERVER_INFO_MAX_AGE -- server information (server_info(), including the version) is cached with the session and
+        reused for this many seconds when authenticating, so starting up doesn't fetch it from the JIRA server again.
+        server_info() calls made after authenticating always ask the JIRA server. 0 disables the cache.
+    SESSION_POOL_MAX_IDLE -- pooled sessions unused for more than this many seconds are evicted. None disables idle
+        eviction.
+    SESSION_POOL_SIZE -- maximum number of authenticated clients kept in the process-wide session pool. Subsequent
+        `with` blocks with the same server, user, and options reuse a pooled client (and its open connections) without
+        any HTTP requests. Entries are dropped when the JIRA server returns HTTP 401. 0 (default) disables the pool.
+    SYNC_OVERLAP -- seconds. sync() also fetches issues updated this long before the high-water mark, covering clock
+        skew between this host and the JIRA server and issues updated while the previous sync was running.
+    TRUST_WINDOW -- if cached cookies were validated by the JIRA server less than this many seconds ago, skip the
+        validation request when entering the context. The first API call validates them instead: if it returns HTTP 401
+        the user is authenticated again and the call is retried once. 0 (default) always validates cookies.
     USER_CAN_ABORT -- by default if a user enters a blank username or password, it is understood that they do not want
         to authenticate to the JIRA server. Set this to False to send blank user/passwords to the JIRA server which will
         inevitably result in an authentication error, causing the program to prompt the user for their credentials
@@ -117,34 +1681,583 @@ class JIRA(jira.client.JIRA):
         won't be prompted for credentials. If cached cookies are valid then the program may be able to authenticate if
         they are not invalid. If cached cookies are not available or are invalid/expired and this is True, user will not
         be authenticated and `authentication_failed` will be set to True. This variable is useful to set during
-        instantiation when used within a thread.
+        instantiation when used within a thread which can't prompt (another thread authenticating at the same time
+        still shares its session with this one).
     authentication_failed -- will be set to True if authentication was not successful and user is not prompted for
         credentials.
     """
 
     ABORTED_BY_USER = False
+    CONNECTION_POOL_SIZE = 10
     COOKIE_CACHE_FILE_PATH = os.path.join(os.path.expanduser('~'), '.jira_session_json')
+    COOKIE_DURABILITY = 'always'
     FORCE_USER = None
+    ISSUE_STORE = False
+    KEEP_ALIVE_INTERVAL = 0
+    LAZY_CONNECT = False
     MESSAGE_AUTH_ERROR = 'Error occurred, try again.'
     MESSAGE_AUTH_FAILURE = 'Authentication failed or bad password, try again.'
+    METRICS_CALLBACK = None
     PROMPT_PASS = 'JIRA password: '
     PROMPT_USER = 'JIRA username: '
+    RATE_LIMIT = 0
+    RATE_LIMIT_BURST = 10
+    RATE_LIMIT_CONCURRENCY = 0
+    RATE_LIMIT_SHARED = False
+    RESPONSE_CACHE_MAX_SIZE = 10485760
+    RESPONSE_CACHE_TTLS = None
+    RETRY_ON_401 = False
+    SEARCH_BACKOFF = 1.0
+    SEARCH_BATCH_SIZE = 100
+    SEARCH_PAGE_SIZE = 100
+    SEARCH_PREFETCH = 1
+    SEARCH_RETRIES = 4
+    SEARCH_WORKERS = 8
+    SERVER_INFO_MAX_AGE = 86400
+    SESSION_POOL_MAX_IDLE = 300
+    SESSION_POOL_SIZE = 0
+    SYNC_OVERLAP = 300
+    TRUST_WINDOW = 0
     USER_CAN_ABORT = True
 
     def __init__(self, prompt_for_credentials=True, *args, **kwargs):
+        _import_client()
         self.authentication_failed = False
         self.prompt_for_credentials = prompt_for_credentials
         self.__authenticated_with_cookies = False  # True if cached cookies were used to authenticate successfully.
         self.__authenticated_with_password = False  # True if cached cookies were not used to authenticate successfully.
-        self.__cached_cookies = _load_cookies(self.COOKIE_CACHE_FILE_PATH)
+        self.__authenticated_with_pool = False  # True if an authenticated client was reused from the session pool.
+        self.__server = _server_url(args, kwargs, self.DEFAULT_OPTIONS['server'])
+        self.__generation = _SINGLE_FLIGHT.generation()  # Sessions published by other threads after this are newer.
+        self.__user, cached = _find_session(_SESSION_TOKENS, self.__server, self.FORCE_USER)
+        self.__from_token = _sanitize_session(cached or dict()) is not None  # Trusted, nothing read from disk.
+        if not self.__from_token:
+            with self.__timed('load_cookies'):
+                self.__user, cached = _lookup_session(self.COOKIE_CACHE_FILE_PATH, self.__server, self.FORCE_USER)
+        self.__count('cookie_hit' if cached else 'cookie_miss')
+        self.__cached_cookies = dict(JSESSIONID=cached['JSESSIONID']) if cached else dict()
+        self.__expires = cached['expires'] if cached else None  # When the cached session is to be discarded.
+        self.__validated_at = cached['validated'] if cached else None
+        self.__server_info = cached['server_info'] if cached else None  # Cached jira.client.JIRA.server_info().
+        self.__server_info_saved = cached['server_info_saved'] if cached else None
+        self.__connect_pending = False  # True if LAZY_CONNECT deferred authentication until first use.
+        self.__constructed = False  # True if the last attempt constructed the parent class but failed to authenticate.
         self.__delayed_args = (args, kwargs)
+        self.__initializing = False  # True while jira.client.JIRA.__init__() runs.
+        self.__keep_alive = None  # threading.Event stopping the keep-alive thread, None if not running.
+        self.__last_activity = time.time()  # When the JIRA server last responded to a request.
+        self.__reauthentication_lock = threading.Lock()  # Serializes re-authentication after HTTP 401 responses.
+        self.__revalidated = False  # True if cached cookies were validated again after being read from disk.
+        self.__server_info_fetched = False  # True if __server_info was fetched from the JIRA server, to be cached.
+        self.__validation_pending = False  # True if cached cookies were trusted without validating them.
+        self.__own_attributes = frozenset(self.__dict__) | frozenset(['_JIRA__own_attributes'])
 
     def __enter__(self):
         """Entering context, ask user for credentials if cookies fail."""
-        if self.ABORTED_BY_USER:
+        with self.__timed('enter'):
+            if self.ABORTED_BY_USER:
+                return self
+
+            # Reuse an already authenticated client from the session pool.
+            if self.__adopt_pooled():
+                self.__start_keep_alive()
+                return self
+
+            if self.LAZY_CONNECT:
+                self.__connect_pending = True
+                return self
+
+            self.__connect()
+            self.__start_keep_alive()
             return self
 
-        # Prompt for credentials until valid ones are given, user aborts, or user presses ctrl+c.
+    def __exit__(self, *_):
+        """Caches cookies to disk if they have changed."""
+        if self.__keep_alive is not None:
+            self.__keep_alive.set()  # Stop the keep-alive thread.
+            self.__keep_alive = None
+        if self.__connect_pending:
+            # Never used the JIRA server, nothing to save.
+            self.__connect_pending = False
+            return
+        if self.ABORTED_BY_USER or self.authentication_failed:
+            # Unable to authenticate, not saving cookies.
+            return
+        if self.__authenticated_with_pool:
+            # Pooled client was authenticated (and its cookies cached) by another instance, not saving cookies.
+            return
+        if self.__from_token and self.__authenticated_with_cookies:
+            # Session handed over by another process with install_session_token(), that process caches it.
+            return
+        if not self.__cached_cookies or (
+                self.__authenticated_with_cookies and not self.__revalidated and not self.__server_info_fetched):
+            # Previous session resumed from cached cookies or no cookies to cache, not saving cookies.
+            return
+        with self.__timed('save_cookies'):
+            _save_cookies(self.COOKIE_CACHE_FILE_PATH, self.__cached_cookies, self.__validated_at, self.__server,
+                          self.__user, self.__expires, self.COOKIE_DURABILITY, self.__server_info,
+                          self.__server_info_saved)
+
+    def search_many(self, queries, workers=None, **kwargs):
+        """Run many JQL searches concurrently over this instance's authenticated session (cookies and connections).
+
+        Searches rejected by the JIRA server with HTTP 429 are retried with backoff, see SEARCH_BACKOFF and
+        SEARCH_RETRIES. HTTP 502, 503, and 504 are already retried by jira.client.JIRA's session (max_retries).
+
+        Positional arguments:
+        queries -- iterable of JQL query strings.
+
+        Keyword arguments:
+        workers -- maximum number of searches running at once. Defaults to SEARCH_WORKERS.
+        kwargs -- passed to jira.client.JIRA.search_issues() for every query (e.g. maxResults or fields).
+
+        Returns:
+        List of search_issues() return values in the same order as `queries`.
+        """
+        queries = list(queries)
+        if not queries:
+            return list()
+        self.__connect_if_pending()
+        from multiprocessing.pool import ThreadPool  # Imported on first use, it takes a while.
+        pool = ThreadPool(max(1, min(workers or self.SEARCH_WORKERS, len(queries))))
+        try:
+            return pool.map(functools.partial(self.__search_with_backoff, kwargs=kwargs), queries, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    def fetch_issues(self, keys, fields=None, batch_size=None, workers=None, **kwargs):
+        """Fetch many issues by key with a few concurrent searches instead of one issue() request per key.
+
+        Keys are looked up `batch_size` at a time with `key in (...)` JQL searches, run concurrently by search_many().
+        If the JIRA server returns fewer issues per page than `batch_size`, the rest of the batch is paged through.
+
+        Positional arguments:
+        keys -- iterable of issue keys (e.g. 'FAKE-1'). Duplicates are fetched once.
+
+        Keyword arguments:
+        fields -- list (or comma separated string) of field names to fetch (e.g. ['summary', 'status']) instead of
+            every navigable field.
+        batch_size -- maximum number of keys per search. Defaults to SEARCH_BATCH_SIZE.
+        workers -- maximum number of searches running at once. Defaults to SEARCH_WORKERS.
+        kwargs -- passed to jira.client.JIRA.search_issues() for every search (e.g. expand). If json_result is True
+            issues are dicts instead of jira.resources.Issue instances.
+
+        Returns:
+        Dict of issue keys and issues. Keys which don't exist (or the user can't see) are missing. Issues which moved
+            to another project are under their new key.
+        """
+        keys = list(_unique(keys))
+        batch_size = batch_size or self.SEARCH_BATCH_SIZE
+        queries = ['key in ({0})'.format(', '.join(_jql_string(k) for k in keys[i:i + batch_size]))
+                   for i in range(0, len(keys), batch_size)]
+        if fields is not None:
+            kwargs['fields'] = fields
+        json_result = kwargs.pop('json_result', False)
+        kwargs.update(maxResults=batch_size, validate_query=False, json_result=True)
+        issues = dict()
+        for query, result in zip(queries, self.search_many(queries, workers, **kwargs)):
+            page = result.get('issues') or list()
+            issues.update((issue['key'], issue) for issue in page)
+            if page and len(page) < result.get('total', 0):  # The JIRA server caps maxResults (e.g. 100 on Cloud).
+                rest = self.iter_issues(query, batch_size, 0, **dict(kwargs, startAt=len(page)))
+                issues.update((issue['key'], issue) for issue in rest)
+        if json_result:
+            return issues
+        return dict((k, jira.resources.Issue(self._options, self._session, raw=i)) for k, i in issues.items())
+
+    def session_token(self):
+        """Return a picklable token of the authenticated session, to be passed to install_session_token().
+
+        The token holds the server URL, username, session cookie and its metadata (no password). Anyone holding it can
+        use the session until it expires, treat it like the cookie cache file.
+
+        Returns:
+        Dict with server, user, JSESSIONID, validated, expires, saved, server_info, and server_info_saved keys.
+        """
+        self.__connect_if_pending()
+        jsessionid = self.__cached_cookies.get('JSESSIONID') if not self.authentication_failed else None
+        if self.ABORTED_BY_USER or not jsessionid:
+            raise RuntimeError('Not authenticated.')
+        return dict(
+            server=self.__server, user=self.__user or '', JSESSIONID=jsessionid, validated=self.__validated_at,
+            expires=self.__expires, saved=time.time(), server_info=self.__server_info,
+            server_info_saved=self.__server_info_saved,
+        )
+
+    def server_info(self):
+        """Get a dict of server information for this JIRA instance.
+
+        While jira.client.JIRA.__init__() runs (when authenticating), server information cached with the session is
+        returned if it's younger than SERVER_INFO_MAX_AGE, saving a request. Otherwise it's fetched from the JIRA server
+        and cached with the session on context exit.
+
+        Returns:
+        Dict parsed from the serverInfo JSON response.
+        """
+        if self.__initializing and self.__server_info is not None and (
+                0 <= time.time() - self.__server_info_saved < self.SERVER_INFO_MAX_AGE):
+            return dict(self.__server_info)
+        # JIRA's base class is swapped for jira.client.JIRA at runtime (see _import_client()), pylint can't see that.
+        server_info = super(JIRA, self).server_info()  # pylint: disable=no-member
+        if self.SERVER_INFO_MAX_AGE and isinstance(server_info, dict) and server_info:
+            self.__server_info, self.__server_info_saved = dict(server_info), time.time()
+            self.__server_info_fetched = True
+        return server_info
+
+    def iter_issues(self, jql, page_size=None, prefetch=None, **kwargs):
+        """Yield every issue matching a JQL query while the next pages are fetched in a background thread.
+
+        At most `prefetch` pages wait in memory besides the one being yielded and the one being fetched, so memory use
+        doesn't grow with the number of matching issues. Pages rejected with HTTP 429 are retried like in
+        search_many().
+
+        Positional arguments:
+        jql -- JQL query string.
+
+        Keyword arguments:
+        page_size -- number of issues requested per page (maxResults). Defaults to SEARCH_PAGE_SIZE.
+        prefetch -- number of pages fetched ahead of the one being yielded. Defaults to SEARCH_PREFETCH. 0 fetches each
+            page when it's needed, without a background thread.
+        kwargs -- passed to jira.client.JIRA.search_issues() for every page (e.g. fields or expand). startAt skips that
+            many issues. If json_result is True issues are yielded as dicts instead of jira.resources.Issue instances.
+
+        Yields:
+        One jira.resources.Issue (or dict) at a time, in the order returned by the JIRA server.
+        """
+        self.__connect_if_pending()
+        json_result = kwargs.pop('json_result', False)
+        page_size = page_size or self.SEARCH_PAGE_SIZE
+        prefetch = self.SEARCH_PREFETCH if prefetch is None else prefetch
+
+        def pages(start):
+            while True:
+                params = dict(kwargs, startAt=start, maxResults=page_size, json_result=True)
+                page = self.__search_with_backoff(jql, params)
+                issues = page.get('issues') or list()
+                yield issues
+                start += len(issues)
+                if not issues or start >= page.get('total', 0):
+                    return
+
+        all_pages = pages(kwargs.pop('startAt', 0))
+        for issues in (_prefetch(all_pages, prefetch) if prefetch > 0 else all_pages):
+            for issue in issues:
+                yield issue if json_result else jira.resources.Issue(self._options, self._session, raw=issue)
+
+    def iter_records(self, jql, fields, page_size=None, prefetch=None, **kwargs):
+        """Like iter_issues() but yield compact records holding only the requested fields.
+
+        Issues are projected as their page arrives and the JSON is discarded, so memory used by the records grows with
+        the number of fields requested instead of the size of the JIRA server's responses. Equal strings (e.g. status
+        or assignee names) are stored once for all records.
+
+        Positional arguments:
+        jql -- JQL query string.
+        fields -- list of field names (e.g. 'summary' or 'customfield_10000') or dotted paths into them (e.g.
+            'status.name' or 'components.name'). Only these fields are requested from the JIRA server.
+
+        Keyword arguments:
+        page_size -- number of issues requested per page. Defaults to SEARCH_PAGE_SIZE.
+        prefetch -- number of pages fetched ahead. Defaults to SEARCH_PREFETCH.
+        kwargs -- passed to jira.client.JIRA.search_issues() for every page (e.g. startAt).
+
+        Yields:
+        One namedtuple per issue with a key attribute and one attribute per field, dots replaced with underscores
+            (e.g. status_name). Missing fields are None, lists are tuples, objects are dicts. Repeated fields and 'key'
+            (always there) are ignored.
+        """
+        paths = list(_unique(tuple(f.split('.')) for f in fields if f != 'key'))
+        record = namedtuple('IssueRecord', ['key'] + ['_'.join(p) for p in paths])
+        kwargs['fields'] = list(_unique(p[0] for p in paths)) or ['key']  # Not the JIRA server's default fields.
+        interned = dict()
+        for issue in self.iter_issues(jql, page_size, prefetch, json_result=True, **kwargs):
+            values = issue.get('fields') or dict()
+            yield record(issue['key'], *[_project(values, p, interned) for p in paths])
+
+    def sync(self, jql, fields=None, page_size=None, prefetch=None):
+        """Fetch issues matching a JQL query updated since the last sync and merge them into the local issue store.
+
+        The store is an SQLite database at COOKIE_CACHE_FILE_PATH + '_issues.sqlite', kept separately for every server
+        and user. It records the latest `updated` time seen per JQL query (the high-water mark), so the next sync of
+        that query only asks for issues updated after it (less SYNC_OVERLAP). The first sync fetches every matching
+        issue. Issues which are deleted or no longer match the query aren't removed from the store.
+
+        Positional arguments:
+        jql -- JQL query string. An ORDER BY clause is replaced with ORDER BY updated.
+
+        Keyword arguments:
+        fields -- list of field names to fetch and store (updated is always added). Defaults to the JIRA server's.
+        page_size -- number of issues requested per page. Defaults to SEARCH_PAGE_SIZE.
+        prefetch -- number of pages fetched ahead. Defaults to SEARCH_PREFETCH.
+
+        Returns:
+        Number of issues fetched (new or updated since the last sync, plus the overlap).
+        """
+        store = self.__issue_store()
+        base = re.sub(r'(?is)\s*\bORDER\s+BY\b.*$', '', jql).strip()
+        high_water = store.high_water(jql)
+        if high_water is not None:
+            # Relative to the JIRA server's clock and time zone, both unknown here. SYNC_OVERLAP absorbs clock skew.
+            minutes = int((time.time() - high_water + self.SYNC_OVERLAP) / 60) + 1
+            base = '({0}) AND updated >= -{1}m'.format(base, minutes) if base else 'updated >= -{0}m'.format(minutes)
+        kwargs = dict(json_result=True)
+        if fields is not None:
+            kwargs['fields'] = list(_unique(itertools.chain(fields, ['updated'])))
+        issues = self.iter_issues((base + ' ORDER BY updated ASC').strip(), page_size, prefetch, **kwargs)
+        return store.merge(jql, issues, page_size or self.SEARCH_PAGE_SIZE, write=not self.ISSUE_STORE)
+
+    def find_issues(self, keys=None, project=None, status=None, assignee=None, updated_since=None, fallback=False):
+        """Query the local issue store (filled by sync() and ISSUE_STORE) instead of the JIRA server.
+
+        Filters are answered from indexed columns, every given filter must match. Without filters every stored issue of
+        the JIRA server and user is returned.
+
+        Keyword arguments:
+        keys -- list of issue keys.
+        project -- project key (e.g. 'FAKE') or list of them.
+        status -- status name (e.g. 'Open') or list of them.
+        assignee -- assignee username (accountId on JIRA Cloud) or list of them.
+        updated_since -- seconds since the epoch, only issues updated at or after this time.
+        fallback -- if True, keys missing from the store are fetched with fetch_issues(), or if nothing matched the
+            filters (at least one besides keys) are searched for on the JIRA server. Issues fetched are stored.
+
+        Returns:
+        List of issue dicts (decoded JSON as returned by the JIRA server), ordered by key.
+        """
+        store = self.__issue_store()
+        filters = dict(keys=keys, project=project, status=status, assignee=assignee, updated_since=updated_since)
+        issues = store.find(**filters)
+        if not fallback:
+            return issues
+        if keys is not None:
+            missing = set([keys] if isinstance(keys, (str, _TEXT)) else keys) - set(i['key'] for i in issues)
+            if not missing:
+                return issues
+            fetched = list(self.fetch_issues(sorted(missing), json_result=True).values())
+        elif issues:
+            return issues
+        else:
+            clauses = list()
+            for field, value in (('project', project), ('status', status), ('assignee', assignee)):
+                if value is not None:
+                    values = [value] if isinstance(value, (str, _TEXT)) else list(value)
+                    clauses.append('{0} in ({1})'.format(field, ', '.join(_jql_string(v) for v in values)))
+            if updated_since is not None:
+                clauses.append('updated >= -{0}m'.format(int((time.time() - updated_since) / 60) + 1))
+            if not clauses:
+                return issues
+            fetched = list(self.iter_issues(' AND '.join(clauses), json_result=True))
+        if not self.ISSUE_STORE:
+            store.put(fetched)
+        return store.find(**filters)
+
+    @property
+    def _session(self):
+        """requests.Session created by jira.client.JIRA.__init__(), kept in __dict__ like any other attribute."""
+        try:
+            return self.__dict__['_session']
+        except KeyError:
+            raise AttributeError('_session')  # Falls back to __getattr__().
+
+    @_session.setter
+    def _session(self, session):
+        """Mount the connection pool shared with other instances (see CONNECTION_POOL_SIZE) on new sessions."""
+        if session is not None and self.CONNECTION_POOL_SIZE:
+            session.mount(*_shared_adapter(self._options['server'], self.CONNECTION_POOL_SIZE))
+        if session is not None and (self.RATE_LIMIT or self.RATE_LIMIT_CONCURRENCY):
+            self.__mount_rate_limiter(session)
+        self.__dict__['_session'] = session
+
+    def close(self):
+        """Close the session, see jira.client.JIRA.close(). Does nothing while LAZY_CONNECT deferred authentication.
+
+        Looking up _session would authenticate. jira.client.JIRA.close() doesn't exist before jira 2.0.
+        """
+        if self.__dict__.get('_JIRA__connect_pending'):
+            return
+        close = getattr(super(JIRA, self), 'close', None)
+        if close is not None:
+            close()
+
+    def __del__(self):
+        """Run jira.client.JIRA.__del__() unless LAZY_CONNECT deferred authentication, it looks up _session too."""
+        if self.__dict__.get('_JIRA__connect_pending'):
+            return
+        finalizer = getattr(super(JIRA, self), '__del__', None)
+        if finalizer is not None:
+            finalizer()
+
+    def __getattr__(self, name):
+        """Authenticate on first access of a missing (not yet initialized) attribute if LAZY_CONNECT deferred it.
+
+        jira.client.JIRA methods all use attributes set by its __init__() (e.g. _options and _session), so the first
+        API call ends up here too.
+
+        Positional arguments:
+        name -- name of the attribute being accessed.
+
+        Returns:
+        The attribute's value after authenticating.
+        """
+        if name.startswith('__') or not self.__dict__.get('_JIRA__connect_pending') or self.ABORTED_BY_USER:
+            raise AttributeError(name)
+        self.__connect_if_pending()
+        return getattr(self, name)
+
+    def __connect_if_pending(self):
+        """Authenticate now if LAZY_CONNECT deferred it, before background threads race through __getattr__()."""
+        if self.__connect_pending:
+            self.__connect_pending = False
+            self.__connect()
+            self.__start_keep_alive()
+
+    def __start_keep_alive(self):
+        """Start the keep-alive thread if KEEP_ALIVE_INTERVAL is set and it isn't running already."""
+        if not self.KEEP_ALIVE_INTERVAL or self.__keep_alive is not None or self.ABORTED_BY_USER or (
+                self.authentication_failed):
+            return
+        self.__keep_alive = threading.Event()
+        thread = threading.Thread(target=self.__keep_session_alive, args=(self.__keep_alive, self.KEEP_ALIVE_INTERVAL))
+        thread.daemon = True
+        thread.start()
+
+    def __keep_session_alive(self, stop, interval):
+        """Keep-alive thread target. Sends a request whenever the session has been idle for `interval` seconds.
+
+        Positional arguments:
+        stop -- threading.Event set by __exit__() to stop the thread.
+        interval -- seconds of inactivity after which the session is pinged.
+        """
+        timeout = interval
+        while True:
+            stop.wait(timeout)
+            if stop.is_set():
+                return
+            idle = time.time() - self.__last_activity
+            if idle < interval:
+                timeout = interval - idle  # Another request kept the session alive in the meantime.
+                continue
+            try:
+                # Current user, renews the session on the JIRA server. Not session(), it logs in again with a password.
+                # Options have no auth_url before jira 2.0.
+                url = self._options['server'] + self._options.get('auth_url', '/rest/auth/1/session')
+                request = self._session.prepare_request(requests.models.Request('GET', url))
+                request.keep_alive = True  # Never authenticates again from this thread, see __check_response().
+                self._session.send(request).close()
+            except requests.exceptions.RequestException:
+                self.__last_activity = time.time()  # Try again after another interval.
+            timeout = interval
+
+    def __search_with_backoff(self, query, kwargs):
+        """Call search_issues(), sleeping and retrying while the JIRA server responds with HTTP 429.
+
+        Not 503: jira.client.JIRA's session retries it (and 502 and 504) with its own backoff, retrying here too would
+        multiply the attempts.
+
+        Positional arguments:
+        query -- JQL query string.
+        kwargs -- dict of keyword arguments for search_issues().
+
+        Returns:
+        search_issues() return value.
+        """
+        for attempt in itertools.count():
+            try:
+                result = self.search_issues(query, **kwargs)
+            except jira.exceptions.JIRAError as e:
+                if e.status_code != 429 or attempt >= self.SEARCH_RETRIES:
+                    raise
+                time.sleep(_backoff_delay(e, attempt, self.SEARCH_BACKOFF))
+                continue
+            if self.ISSUE_STORE and self.COOKIE_CACHE_FILE_PATH:
+                self.__issue_store().put((result.get('issues') or list()) if isinstance(result, dict) else
+                                         [issue.raw for issue in result])
+            return result
+
+    def __issue_store(self):
+        """Return the _IssueStore of the JIRA server and user, next to the cookie cache file.
+
+        Authenticates first if LAZY_CONNECT deferred it, the username may not be known until then.
+        """
+        if not self.COOKIE_CACHE_FILE_PATH:
+            raise RuntimeError('COOKIE_CACHE_FILE_PATH is not set.')
+        self.__connect_if_pending()
+        return _IssueStore(self.COOKIE_CACHE_FILE_PATH + '_issues.sqlite', self.__server, self.__user or '')
+
+    def __adopt_pooled(self):
+        """Reuse an already authenticated client from the session pool, if enabled.
+
+        Returns:
+        True if a pooled client was adopted, False otherwise.
+        """
+        if not self.SESSION_POOL_SIZE:
+            return False
+        state = _SESSION_POOL.get(self.__pool_key(), self.SESSION_POOL_MAX_IDLE)
+        if state is None:
+            return False
+        self.__dict__.update(state)
+        jsessionid = self._session.cookies.get('JSESSIONID')
+        if jsessionid:
+            self.__cached_cookies = dict(JSESSIONID=jsessionid)  # Recognizes its rejection in __check_response().
+        self.__own_session()
+        self.authentication_failed = False
+        self.__authenticated_with_pool = True
+        self.__count('pool_hit')
+        return True
+
+    def __connect(self):
+        """Authenticate while holding the single-flight lock, reusing what other threads did in the meantime.
+
+        Returns:
+        True if successfully authenticated, False otherwise.
+        """
+        key = self.__pool_key()
+        lock = _SINGLE_FLIGHT.lock(key)
+        with self.__timed('lock_wait'):
+            lock.acquire()
+        try:
+            if self.ABORTED_BY_USER:
+                return False
+            if self.__adopt_pooled():
+                return True
+
+            if _SINGLE_FLIGHT.rejected(key, self.__cached_cookies):
+                self.__cached_cookies = dict()
+
+            # Another thread authenticated after this instance read its cookies (or this instance has none), use its
+            # session.
+            shared = _SINGLE_FLIGHT.newer(key, self.__generation if self.__cached_cookies else 0)
+            if shared and not _SINGLE_FLIGHT.rejected(key, shared['cookies']):
+                self.__generation = shared['generation']
+                self.__cached_cookies = dict(shared['cookies'])
+                self.__expires, self.__user = shared['expires'], shared['user']
+                self.__validated_at = shared['validated']
+                if shared['server_info'] is not None:
+                    self.__server_info, self.__server_info_saved = shared['server_info'], shared['server_info_saved']
+                if self.__authenticate(trusted=True):
+                    self.__add_to_pool()
+                    self.__count('shared_session')
+                    return True
+
+            if not self.__prompt_and_authenticate():
+                return False
+            self.__add_to_pool()
+            if not self.__validation_pending:
+                self.__generation = _SINGLE_FLIGHT.publish(key, dict(
+                    cookies=self.__cached_cookies, validated=self.__validated_at, user=self.__user,
+                    expires=self.__expires, server_info=self.__server_info, server_info_saved=self.__server_info_saved,
+                ))
+            return True
+        finally:
+            lock.release()
+
+    def __prompt_and_authenticate(self):
+        """Prompt for credentials until valid ones are given, user aborts, or user presses ctrl+c.
+
+        Returns:
+        True if successfully authenticated, False otherwise.
+        """
         while True:
             if self.__cached_cookies:
                 # No need to prompt for credentials.
@@ -152,63 +2265,177 @@ class JIRA(jira.client.JIRA):
             elif not self.prompt_for_credentials:
                 # Unable to authenticate.
                 self.authentication_failed = True
-                return self
+                return False
             else:
-                username = self.FORCE_USER or _prompt(INPUT, self.PROMPT_USER)
+                with self.__timed('prompt'):
+                    with _PROMPT_LOCK:
+                        username = self.FORCE_USER or _prompt(INPUT, self.PROMPT_USER)
+                        password = _prompt(getpass, self.PROMPT_PASS) if username or not self.USER_CAN_ABORT else ''
                 if not username and self.USER_CAN_ABORT:
                     JIRA.ABORTED_BY_USER = True
-                    return self
-                password = _prompt(getpass, self.PROMPT_PASS)
+                    return False
                 if not password and self.USER_CAN_ABORT:
                     JIRA.ABORTED_BY_USER = True
-                    return self
+                    return False
                 authenticated = self.__authenticate((username, password))
 
             if authenticated:
-                return self
+                return True
 
-    def __exit__(self, *_):
-        """Caches cookies to disk if they have changed."""
-        if self.ABORTED_BY_USER or self.authentication_failed:
-            # Unable to authenticate, not saving cookies.
+    def __check_response(self, response, *_, **kwargs):
+        """requests response hook of authenticated sessions.
+
+        Records the time of the last request for the keep-alive thread, validates trusted cookies with the first
+        successful (2xx, not anonymous) API response, and handles HTTP 401 responses: if the response is to the first
+        API call with trusted cookies (or RETRY_ON_401 is True) the user is authenticated again (prompting for
+        credentials if allowed) and the request is sent once more with the new session. An anonymous response (trusted
+        cookies unknown to the JIRA server) to the first API call is handled like HTTP 401.
+
+        Positional arguments:
+        response -- requests.Response instance.
+
+        Keyword arguments:
+        kwargs -- keyword arguments originally passed to requests.Session.send().
+
+        Returns:
+        requests.Response of the retried request if the user was authenticated again, None otherwise.
+        """
+        if getattr(response, 'from_cache', False) or response.status_code >= 500:
+            return None
+        if response.status_code == 401 and getattr(response.request, 'keep_alive', False):
+            return None  # Keep-alive thread can't prompt, the next API call authenticates again.
+        self.__last_activity = time.time()
+        validation_pending, self.__validation_pending = self.__validation_pending, False
+        # JIRA answers requests with an unknown session cookie anonymously if the resource is publicly readable.
+        anonymous = validation_pending and response.headers.get('X-AUSERNAME') == 'anonymous'
+        if response.status_code != 401 and not anonymous:
+            if validation_pending and 200 <= response.status_code < 300:
+                self.__validated_at = time.time()
+                self.__revalidated = True
+            elif validation_pending:
+                self.__validation_pending = True  # Inconclusive (e.g. HTTP 404), the next response validates them.
+            return None
+        if not (validation_pending or self.RETRY_ON_401) or getattr(response.request, 'reauthenticated', False):
+            return None
+
+        # Session cookies are no longer valid, authenticate again (unless another thread already did) and retry.
+        with self.__reauthentication_lock:
+            rejected = self.__cached_cookies.get('JSESSIONID')
+            if not rejected or 'JSESSIONID={0}'.format(rejected) in response.request.headers.get('Cookie', ''):
+                _SINGLE_FLIGHT.reject(self.__pool_key(), self.__cached_cookies)
+                _SESSION_POOL.discard(self.__pool_key(), self._session)  # Or __connect() adopts it again.
+                self.__cached_cookies = dict()
+                self.__count('fallback_401' if validation_pending else 'reauthentication')
+                if self.ABORTED_BY_USER or not self.__connect():
+                    return None
+        request = response.request.copy()
+        request.reauthenticated = True  # Not retried again.
+        request.headers.pop('Cookie', None)
+        request.prepare_cookies(self._session.cookies)
+        if self._session.auth:
+            request.prepare_auth(self._session.auth)
+        return self._session.send(request, **kwargs)
+
+    def __own_session(self):
+        """Route the responses of the session to this instance's __check_response(), see _ResponseDispatcher."""
+        for hook in self._session.hooks['response']:
+            if isinstance(hook, _ResponseDispatcher):
+                hook.owner = weakref.ref(self)
+                return
+        self._session.hooks['response'].append(_ResponseDispatcher(self))
+
+    def __count(self, name):
+        """Increment a METRICS_CALLBACK counter."""
+        if self.METRICS_CALLBACK is not None:
+            self.__metrics_callback()('counter', name, 1)
+
+    def __metrics_callback(self):
+        """Return METRICS_CALLBACK as set on the class, functions stored there aren't bound to this instance."""
+        callback = self.__class__.METRICS_CALLBACK
+        return callback.__func__ if getattr(callback, '__self__', False) is None else callback  # Python 2 unbound.
+
+    @contextmanager
+    def __timed(self, name):
+        """Context manager reporting the time spent in its block to METRICS_CALLBACK, even if it raises."""
+        if self.METRICS_CALLBACK is None:
+            yield
             return
-        if self.__authenticated_with_cookies or not self.__cached_cookies:
-            # Previous session resumed from cached cookies or no cookies to cache, not saving cookies.
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.__metrics_callback()('timer', name, time.time() - started)
+
+    def __pool_key(self):
+        """Return the session pool key for this instance's server, user, and options."""
+        args, kwargs = self.__delayed_args
+        return _pool_key(args, kwargs, self.FORCE_USER)
+
+    def __add_to_pool(self):
+        """Share the authenticated client with other instances through the session pool, if enabled."""
+        if not self.SESSION_POOL_SIZE:
             return
-        _save_cookies(self.COOKIE_CACHE_FILE_PATH, self.__cached_cookies)
+        key = self.__pool_key()
+        state = dict((k, v) for k, v in self.__dict__.items() if k not in self.__own_attributes)
+        self._session.hooks['response'].append(_discard_on_401(key, self._session))
+        _SESSION_POOL.put(key, state, self.SESSION_POOL_SIZE)
 
-    def __authenticate(self, basic_auth=None):
+    def __authenticate(self, basic_auth=None, trusted=False):
         """Attempt to authenticate to the JIRA server with either cookies or basic authentication. Handles errors too.
 
-        If self.prompt_for_credentials is True, prints error messages to stderr.
+        If self.prompt_for_credentials is True, prints error messages to stderr. If the previous attempt got as far as
+        constructing the parent class, its client is reused with the new credentials instead of constructing it again.
 
         Keyword arguments:
         basic_auth -- tuple to be passed to jira.client.JIRA.__init__() parent class. First string is the username,
             second string is the password. None if using cookie authentication.
+        trusted -- use cached cookies without validating them (validated lazily by the first API call instead).
 
         Returns:
         True if successfully authenticated, False otherwise.
         """
         try:
-            # Call delayed __init__() method from parent class.
-            args, kwargs = self.__delayed_args
-            super(JIRA, self).__init__(basic_auth=basic_auth, *args, **kwargs)
+            if self.__constructed and basic_auth:
+                # Previous attempt failed after constructing the parent class, only swap the credentials.
+                self._session.cookies.clear()
+                self._session.auth = basic_auth
+                self._session.cert = self._options['client_cert']
+            else:
+                # Call delayed __init__() method from parent class.
+                args, kwargs = self.__delayed_args
+                self.__constructed = False
+                self.__initializing = True
+                try:
+                    with self.__timed('parent_init'):
+                        super(JIRA, self).__init__(basic_auth=basic_auth, *args, **kwargs)
+                finally:
+                    self.__initializing = False
+                self.__constructed = True
 
             # Inject cached cookies.
             for k, v in self.__cached_cookies.items():
                 self._session.cookies.set(k, v)
 
             # Validate cookies or credentials. May raise JIRAError.
-            self.session()
+            trusted = trusted or not basic_auth and (self.__from_token or self.TRUST_WINDOW and (
+                self.__validated_at is not None and 0 <= time.time() - self.__validated_at < self.TRUST_WINDOW))
+            if trusted:
+                self.__validation_pending = True
+                self.__own_session()
+            else:
+                with self.__timed('login' if basic_auth else 'validate'):
+                    self.session()
+                self.__own_session()
 
-        except JIRAError as e:
+        except jira.exceptions.JIRAError as e:
             if e.status_code != 401:
                 # Some unknown error occurred.
                 if self.prompt_for_credentials and self.MESSAGE_AUTH_ERROR:
                     print(self.MESSAGE_AUTH_ERROR, file=sys.stderr)
             elif self.__cached_cookies:
                 # User has not entered a password. Probably invalid cookies, probably first iteration.
-                pass
+                _SINGLE_FLIGHT.reject(self.__pool_key(), self.__cached_cookies)
+                self.__count('fallback_401')
             else:
                 # JIRAError raised HTTP 401 and cookies are not cached, invalid password.
                 if self.prompt_for_credentials and self.MESSAGE_AUTH_FAILURE:
@@ -221,7 +2448,109 @@ class JIRA(jira.client.JIRA):
 
         # Authentication was successful if this is reached.
         self.authentication_failed = False
-        self.__cached_cookies = self._session.cookies.get_dict() if basic_auth else self.__cached_cookies
+        self.__constructed = False  # Authenticating again (e.g. after HTTP 401) starts with a new client.
+        if not self.__validation_pending:
+            self.__validated_at = time.time()
+            self.__revalidated = bool(self.TRUST_WINDOW)
+        if basic_auth:
+            self.__cached_cookies = self._session.cookies.get_dict()
+            self.__expires = ([c.expires for c in self._session.cookies if c.name == 'JSESSIONID'] + [None])[0]
+            self.__user = basic_auth[0]
         self.__authenticated_with_cookies = not bool(basic_auth)
         self.__authenticated_with_password = bool(basic_auth)
+        self.__mount_response_cache()
         return True
+
+    def __mount_rate_limiter(self, session):
+        """Wrap a new session's transport adapter for the JIRA server in _RateLimitedAdapter, see RATE_LIMIT.
+
+        Mounted when the parent class creates its session, so the requests sent while authenticating are limited too.
+
+        Positional arguments:
+        session -- requests.Session instance.
+        """
+        file_path = None
+        if self.RATE_LIMIT_SHARED and self.COOKIE_CACHE_FILE_PATH:
+            digest = hashlib.sha1(self.__server.encode('utf-8')).hexdigest()[:16]
+            file_path = '{0}_rate_limit_{1}'.format(self.COOKIE_CACHE_FILE_PATH, digest)
+        limiter = _rate_limiter(self.__server, self.RATE_LIMIT, self.RATE_LIMIT_BURST, self.RATE_LIMIT_CONCURRENCY,
+                                file_path)
+        prefix = self._options['server'].rstrip('/') + '/'
+        session.mount(prefix, _RateLimitedAdapter(session.get_adapter(prefix), limiter))
+
+    def __mount_response_cache(self):
+        """Wrap the session's transport adapter for the JIRA server in _ResponseCache if RESPONSE_CACHE_TTLS is set.
+
+        Responses are only cached if the username is known, otherwise they could be served to another user.
+        """
+        if not self.RESPONSE_CACHE_TTLS or not self.COOKIE_CACHE_FILE_PATH or not self.__user:
+            return
+        prefix = self._options['server'].rstrip('/') + '/'
+        adapter = _ResponseCache(self._session.get_adapter(prefix), self.COOKIE_CACHE_FILE_PATH + '_responses',
+                                 [self.__server, self.__user], dict(self.RESPONSE_CACHE_TTLS),
+                                 self.RESPONSE_CACHE_MAX_SIZE)
+        self._session.mount(prefix, adapter)
+
+
+def _asyncio():
+    """Return the asyncio module (imported on first use, it takes a while), None if unavailable (Python < 3.4)."""
+    try:
+        import asyncio
+    except ImportError:
+        return None
+    return asyncio
+
+
+class AsyncJIRA(JIRA):
+    """JIRA subclass for asyncio applications. Use `async with AsyncJIRA() as j:` instead of `with JIRA() as j:`.
+
+    Reading the cookie cache file, authenticating (validating cookies, prompting, logging in), and saving cookies run in
+    the event loop's default executor so they don't block the event loop. Blocking jira.client.JIRA methods are awaited
+    through run(). Many coroutines can share one instance (and its authenticated session), and concurrent `async with`
+    blocks for the same server and user share one login through JIRA's single-flight authentication. The cookie cache
+    file and every class variable are the same as JIRA's.
+
+    Requires Python 3.5 or later.
+    """
+
+    def __init__(self, prompt_for_credentials=True, *args, **kwargs):  # pylint: disable=super-init-not-called
+        if _asyncio() is None:
+            raise RuntimeError('AsyncJIRA requires asyncio.')
+        self.__init_args = (prompt_for_credentials, args, kwargs)  # JIRA.__init__() reads from disk, deferred.
+
+    def __aenter__(self):
+        """Entering context, read cached cookies and authenticate in the executor.
+
+        Returns:
+        asyncio.Future resolving to this instance.
+        """
+        prompt_for_credentials, args, kwargs = self.__init_args
+
+        def enter():
+            JIRA.__init__(self, prompt_for_credentials, *args, **kwargs)
+            return self.__enter__()
+        return _asyncio().get_event_loop().run_in_executor(None, enter)
+
+    def __aexit__(self, *exc_info):
+        """Exiting context, cache cookies to disk in the executor.
+
+        Returns:
+        asyncio.Future resolving to None.
+        """
+        return _asyncio().get_event_loop().run_in_executor(None, functools.partial(self.__exit__, *exc_info))
+
+    def run(self, method, *args, **kwargs):
+        """Call a blocking method in the event loop's default executor.
+
+        Positional arguments:
+        method -- name of a jira.client.JIRA method (e.g. 'search_issues') or any callable.
+
+        Returns:
+        asyncio.Future resolving to the method's return value.
+        """
+        func = getattr(self, method) if isinstance(method, str) else method
+        return _asyncio().get_event_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+if sys.version_info < (3, 7):
+    _import_client()  # Modules can't have __getattr__(), JIRAError must exist when importing it from this module.
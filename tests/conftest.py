@@ -1,3 +1,6 @@
+import re
+
+import httpretty
 import pytest
 
 import jira_context
@@ -9,12 +12,55 @@ def reset_jira():
     jira_context._prompt = lambda f, p: 'user' if f == INPUT else 'pass'
 
     JIRA.ABORTED_BY_USER = False
+    JIRA.CONNECTION_POOL_SIZE = 10
     JIRA.COOKIE_CACHE_FILE_PATH = None
+    JIRA.COOKIE_DURABILITY = 'always'
     JIRA.FORCE_USER = None
+    JIRA.ISSUE_STORE = False
+    JIRA.KEEP_ALIVE_INTERVAL = 0
+    JIRA.LAZY_CONNECT = False
     JIRA.MESSAGE_AUTH_ERROR = 'Error occurred, try again.'
     JIRA.MESSAGE_AUTH_FAILURE = 'Authentication failed or bad password, try again.'
+    JIRA.METRICS_CALLBACK = None
     JIRA.PROMPT_PASS = 'JIRA password: '
     JIRA.PROMPT_USER = 'JIRA username: '
+    JIRA.RATE_LIMIT = 0
+    JIRA.RATE_LIMIT_BURST = 10
+    JIRA.RATE_LIMIT_CONCURRENCY = 0
+    JIRA.RATE_LIMIT_SHARED = False
+    JIRA.RESPONSE_CACHE_MAX_SIZE = 10485760
+    JIRA.RESPONSE_CACHE_TTLS = None
+    JIRA.RETRY_ON_401 = False
+    JIRA.SEARCH_BACKOFF = 1.0
+    JIRA.SEARCH_BATCH_SIZE = 100
+    JIRA.SEARCH_PAGE_SIZE = 100
+    JIRA.SEARCH_PREFETCH = 1
+    JIRA.SEARCH_RETRIES = 4
+    JIRA.SEARCH_WORKERS = 8
+    JIRA.SERVER_INFO_MAX_AGE = 86400
+    JIRA.SESSION_POOL_MAX_IDLE = 300
+    JIRA.SESSION_POOL_SIZE = 0
+    JIRA.SYNC_OVERLAP = 300
+    JIRA.TRUST_WINDOW = 0
     JIRA.USER_CAN_ABORT = True
+    getattr(jira_context, '_PENDING_SAVES').clear()
+    getattr(jira_context, '_RATE_LIMITERS').clear()
+    getattr(jira_context, '_RESPONSE_CACHE_SIZES').clear()
+    getattr(jira_context, '_SESSION_POOL').clear()
+    getattr(jira_context, '_SESSION_TOKENS').clear()
+    getattr(jira_context, '_SHARED_ADAPTERS').clear()
+    getattr(jira_context, '_SINGLE_FLIGHT').clear()
 
     JIRA.DEFAULT_OPTIONS['server'] = 'http://localhost/jira'
+
+
+@pytest.fixture
+def stub_search(tmpdir):
+    """Return a function stubbing a JIRA server (with a cached session) whose searches are answered by a callback."""
+    def register(search_callback):
+        JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+        getattr(jira_context, '_save_cookies')(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+        httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+        httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}')
+        httpretty.register_uri(httpretty.GET, re.compile('.*/search.*'), body=search_callback)
+    return register
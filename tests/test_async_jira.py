@@ -0,0 +1,78 @@
+import re
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import AsyncJIRA, JIRA
+
+asyncio = pytest.importorskip('asyncio')
+_load_cookies = getattr(jira_context, '_load_cookies')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+@pytest.fixture
+def loop():
+    event_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(event_loop)
+    yield event_loop
+    asyncio.set_event_loop(None)
+    event_loop.close()
+
+
+@pytest.mark.httpretty
+def test_enter_does_not_block(tmpdir, loop):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+    ticks = list()
+
+    def tick():
+        ticks.append(time.time())
+        loop.call_later(0.01, tick)
+
+    def session_callback(_, __, headers):
+        time.sleep(0.2)
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+
+    j = AsyncJIRA(prompt_for_credentials=False)
+    loop.call_soon(tick)
+    assert j is loop.run_until_complete(j.__aenter__())
+    assert len(ticks) > 5  # Event loop kept running while the session was being validated.
+    assert j.authentication_failed is False
+    assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+    loop.run_until_complete(j.__aexit__(None, None, None))
+
+
+@pytest.mark.httpretty
+def test_shared_session(tmpdir, loop):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    logins, cookies = list(), list()
+
+    def session_callback(_, __, headers):
+        logins.append(True)
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+
+    def server_info_callback(request, _, headers):
+        cookies.append(request.headers['Cookie'])
+        return 200, headers, '{"versionNumbers":[6,4,0]}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body=server_info_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    instances = [AsyncJIRA() for _ in range(8)]
+    entered = loop.run_until_complete(asyncio.gather(*[i.__aenter__() for i in instances]))
+    assert instances == entered
+    assert 1 == len(logins)
+
+    j = instances[0]
+    del cookies[:]
+    results = loop.run_until_complete(asyncio.gather(*[j.run('server_info') for _ in range(10)]))
+    assert [[6, 4, 0]] * 10 == [r['versionNumbers'] for r in results]
+    assert [6, 4, 0] == loop.run_until_complete(j.run(lambda: j.server_info()['versionNumbers']))
+    assert ['JSESSIONID=ABC123'] * 11 == cookies
+
+    loop.run_until_complete(asyncio.gather(*[i.__aexit__(None, None, None) for i in instances]))
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
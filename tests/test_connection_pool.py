@@ -0,0 +1,96 @@
+import re
+import threading
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+_SharedAdapter = getattr(jira_context, '_SharedAdapter')
+
+
+def register(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+
+@pytest.mark.httpretty
+def test_shared(tmpdir):
+    register(tmpdir)
+    adapters = list()
+    for _ in range(2):
+        with JIRA() as j:
+            adapters.append(j._session.get_adapter('http://localhost/jira/rest/api/2/serverInfo'))
+        j.close()
+    assert isinstance(adapters[0], _SharedAdapter)
+    assert adapters[0] is adapters[1]
+
+
+@pytest.mark.httpretty
+def test_disabled(tmpdir):
+    register(tmpdir)
+    JIRA.CONNECTION_POOL_SIZE = 0
+    with JIRA() as j:
+        assert not isinstance(j._session.get_adapter('http://localhost/jira/rest'), _SharedAdapter)
+
+
+def test_keep_alive(tmpdir):
+    connections = list()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            connections.append(True)
+            BaseHTTPRequestHandler.setup(self)
+
+        def do_GET(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            body = b'{"versionNumbers":[6,4,0]}' if self.path.endswith('/serverInfo') else b'[]'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            if self.path.endswith('/session'):
+                self.send_header('Set-Cookie', 'JSESSIONID=ABC123; Path=/')
+            self.end_headers()
+            self.wfile.write(body)
+        do_POST = do_GET
+
+        def log_message(self, *_):
+            pass
+
+    server = type('Server', (ThreadingMixIn, HTTPServer), dict(daemon_threads=True))(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    try:
+        for _ in range(3):
+            with JIRA(server='http://127.0.0.1:{0}'.format(server.server_address[1])) as j:
+                assert j.authentication_failed is False
+            j.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 1 == len(connections)
+
+
+def test_forked_child(monkeypatch):
+    _shared_adapter = getattr(jira_context, '_shared_adapter')
+    parent = _shared_adapter('https://jira.local/jira', 10)
+    assert parent == _shared_adapter('https://JIRA.local/other', 10)
+    monkeypatch.setattr(jira_context.os, 'getpid', lambda: -1)
+    assert parent[1] is not _shared_adapter('https://jira.local/jira', 10)[1]
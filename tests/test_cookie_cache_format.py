@@ -0,0 +1,80 @@
+import base64
+import json
+import struct
+
+import pytest
+
+import jira_context
+
+_decode_index = getattr(jira_context, '_decode_index')
+_find_session = getattr(jira_context, '_find_session')
+_load_session = getattr(jira_context, '_load_session')
+_lookup_session = getattr(jira_context, '_lookup_session')
+_read_cache = getattr(jira_context, '_read_cache')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def save_three(file_path):
+    _save_cookies(file_path, dict(JSESSIONID='A1'), server='http://a', user='alice')
+    _save_cookies(file_path, dict(JSESSIONID='A2'), server='http://a', user='bob', expires=2000000000)
+    _save_cookies(file_path, dict(JSESSIONID='B1'), server='http://b', user='alice')
+
+
+@pytest.mark.parametrize('server,user', [
+    (None, None), ('http://a', None), ('http://a', 'alice'), ('http://a', 'bob'), ('http://a', 'carol'),
+    ('http://b', 'bob'), ('http://c', None), (None, 'alice'),
+])
+def test_lookup(tmpdir, server, user):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    save_three(file_path)
+
+    contents = tmpdir.join('.jira_session_json').read_binary()
+    assert (b'JIRACTX\x00', 1, 3) == struct.unpack('>8sHH', contents[:12])
+    assert 3 == len(_decode_index(contents))
+    assert _find_session(_read_cache(file_path), server, user) == _lookup_session(file_path, server, user)
+
+
+def test_migrate_on_read(tmpdir):
+    tmpdir_file = tmpdir.join('.jira_session_json')
+    sessions = {'http://a': {'alice': dict(JSESSIONID='A1', saved=1), 'bob': dict(JSESSIONID='A2', saved=2)}}
+    tmpdir_file.write_binary(base64.b64encode(json.dumps(dict(sessions=sessions)).encode('ascii')))
+    file_path = str(tmpdir_file)
+
+    assert (dict(JSESSIONID='A2'), None) == _load_session(file_path, 'http://a')
+    assert tmpdir_file.read_binary().startswith(b'JIRACTX\x00')
+    assert ['alice', 'bob'] == sorted(_read_cache(file_path)['http://a'])
+    assert (dict(JSESSIONID='A1'), None) == _load_session(file_path, 'http://a', 'alice')
+
+
+def test_one_payload_decoded(tmpdir):
+    tmpdir_file = tmpdir.join('.jira_session_json')
+    file_path = str(tmpdir_file)
+    save_three(file_path)
+
+    # Corrupt every payload but the one of http://b.
+    contents = bytearray(tmpdir_file.read_binary())
+    for record in _decode_index(bytes(contents)):
+        payload = bytes(contents[record[4]:record[4] + record[5]])
+        if b'http://b' not in payload:
+            contents[record[4]:record[4] + record[5]] = b'\xff' * record[5]
+    tmpdir_file.write_binary(bytes(contents))
+
+    assert (dict(JSESSIONID='B1'), None) == _load_session(file_path, 'http://b')
+    assert dict() == _read_cache(file_path)
+    assert (dict(), None) == _load_session(file_path, 'http://a', 'alice')
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda c: c[:12] + b'\x00' * 8,  # Truncated index.
+    lambda c: c[:8] + b'\x00\x02' + c[10:],  # Unknown version.
+    lambda c: c[:-1],  # Last payload out of bounds.
+    lambda c: c[:5],  # Truncated header.
+])
+def test_invalid(tmpdir, corrupt):
+    tmpdir_file = tmpdir.join('.jira_session_json')
+    file_path = str(tmpdir_file)
+    save_three(file_path)
+    tmpdir_file.write_binary(corrupt(tmpdir_file.read_binary()))
+
+    assert (None, None) == _lookup_session(file_path, 'http://a', 'alice')
+    assert dict() == _read_cache(file_path)
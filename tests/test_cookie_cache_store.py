@@ -0,0 +1,115 @@
+import base64
+import re
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_find_session = getattr(jira_context, '_find_session')
+_load_cookies = getattr(jira_context, '_load_cookies')
+_load_session = getattr(jira_context, '_load_session')
+_read_cache = getattr(jira_context, '_read_cache')
+_save_cookies = getattr(jira_context, '_save_cookies')
+_server_url = getattr(jira_context, '_server_url')
+
+
+def test_many_servers_and_users(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='A1'), server='http://a', user='alice')
+    _save_cookies(file_path, dict(JSESSIONID='A2'), server='http://a', user='bob')
+    _save_cookies(file_path, dict(JSESSIONID='B1'), 1400000000, server='http://b', user='alice')
+
+    assert (dict(JSESSIONID='A1'), None) == _load_session(file_path, 'http://a', 'alice')
+    assert (dict(JSESSIONID='A2'), None) == _load_session(file_path, 'http://a', 'bob')
+    assert (dict(JSESSIONID='A2'), None) == _load_session(file_path, 'http://a')  # Most recently saved.
+    assert (dict(JSESSIONID='B1'), 1400000000) == _load_session(file_path, 'http://b', 'alice')
+    assert (dict(), None) == _load_session(file_path, 'http://b', 'bob')
+    assert (dict(), None) == _load_session(file_path, 'http://c')
+    assert dict(JSESSIONID='B1') == _load_cookies(file_path)
+
+    _save_cookies(file_path, dict(), server='http://a', user='bob')
+    assert (dict(JSESSIONID='A1'), None) == _load_session(file_path, 'http://a')
+
+
+def test_expired(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='A1'), server='http://a', user='alice', expires=time.time() - 1)
+    _save_cookies(file_path, dict(JSESSIONID='B1'), server='http://b', user='alice', expires=time.time() + 60)
+
+    assert dict() == _read_cache(file_path).get('http://a', dict())
+    assert (dict(), None) == _load_session(file_path, 'http://a')
+    assert (dict(JSESSIONID='B1'), None) == _load_session(file_path, 'http://b')
+
+
+def test_migrate_old_format(tmpdir):
+    tmpdir_file = tmpdir.join('.jira_session_json')
+    tmpdir_file.write_binary(base64.b64encode(b'{"JSESSIONID": "OLD123"}'))
+    file_path = str(tmpdir_file)
+
+    expected = dict(JSESSIONID='OLD123', validated=None, expires=None, saved=0, server_info=None,
+                    server_info_saved=None)
+    assert ('', expected) == _find_session(_read_cache(file_path), 'http://a', 'alice')
+
+    _save_cookies(file_path, dict(JSESSIONID='NEW123'), server='http://a', user='alice')
+    assert dict(JSESSIONID='NEW123') == _load_cookies(file_path)
+    assert tmpdir_file.read_binary().startswith(b'JIRACTX\x00')
+    assert ['http://a'] == list(_read_cache(file_path))
+
+
+@pytest.mark.parametrize('args,kwargs', [
+    ((), dict()),
+    (('http://a/',), dict()),
+    ((), dict(server='http://a')),
+    ((), dict(options=dict(server='http://a'))),
+    ((dict(server='http://a'),), dict()),
+])
+def test_server_url(args, kwargs):
+    expected = 'http://default' if not (args or kwargs) else 'http://a'
+    assert expected == _server_url(args, kwargs, 'http://default')
+
+
+@pytest.mark.httpretty
+def test_switch_servers(tmpdir):
+    jira_context._prompt = lambda *_: 0 / 0  # ZeroDivisionError if prompted.
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user')
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='DEF456'), server='http://localhost/other', user='user')
+
+    def session_callback(request, _, headers):
+        expected = 'JSESSIONID=ABC123' if request.path.startswith('/jira/') else 'JSESSIONID=DEF456'
+        assert expected == request.headers['Cookie']
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+
+    for server in ('http://localhost/jira', 'http://localhost/other', 'http://localhost/jira/'):
+        with JIRA(server=server) as j:
+            assert j.authentication_failed is False
+            assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+
+    assert dict(JSESSIONID='ABC123') == _load_session(JIRA.COOKIE_CACHE_FILE_PATH, 'http://localhost/jira')[0]
+    assert dict(JSESSIONID='DEF456') == _load_session(JIRA.COOKIE_CACHE_FILE_PATH, 'http://localhost/other')[0]
+
+
+@pytest.mark.httpretty
+def test_password_saved_per_user(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.FORCE_USER = 'other_user'
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user')
+
+    def session_callback(request, _, headers):
+        assert 'Cookie' not in request.headers
+        headers['Set-Cookie'] = 'JSESSIONID=DEF456; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    with JIRA() as j:
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+
+    file_path = JIRA.COOKIE_CACHE_FILE_PATH
+    assert (dict(JSESSIONID='ABC123'), None) == _load_session(file_path, 'http://localhost/jira', 'user')
+    assert dict(JSESSIONID='DEF456') == _load_session(file_path, 'http://localhost/jira', 'other_user')[0]
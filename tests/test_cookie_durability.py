@@ -0,0 +1,83 @@
+import os
+import re
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_flush_pending_saves = getattr(jira_context, '_flush_pending_saves')
+_load_cookies = getattr(jira_context, '_load_cookies')
+_load_session = getattr(jira_context, '_load_session')
+_read_cache_file = getattr(jira_context, '_read_cache_file')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    calls = list()
+    if hasattr(os, 'fdatasync'):
+        real_fdatasync = os.fdatasync
+        monkeypatch.setattr(os, 'fdatasync', lambda fd: calls.append(fd) or real_fdatasync(fd))
+    return calls
+
+
+@pytest.mark.skipif(not hasattr(os, 'fdatasync'), reason='Linux only.')
+@pytest.mark.parametrize('durability,expected', [('always', 1), ('never', 0)])
+def test_sync(tmpdir, synced, durability, expected):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='ABC123'), durability=durability)
+
+    assert dict(JSESSIONID='ABC123') == _load_cookies(file_path)
+    assert expected == len(synced)
+
+
+def test_write_behind(tmpdir, synced):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='OTHER'), server='http://b', user='user')
+    for i in range(10):
+        _save_cookies(file_path, dict(JSESSIONID='ABC{0}'.format(i)), server='http://a', user='user',
+                      durability='write-behind')
+    _save_cookies(file_path, dict(JSESSIONID='DEF'), server='http://c', user='user', durability='write-behind')
+    del synced[:]
+
+    assert ['http://b'] == list(_read_cache_file(file_path))
+    assert (dict(JSESSIONID='ABC9'), None) == _load_session(file_path, 'http://a')  # Visible within the process.
+
+    _flush_pending_saves()
+    assert ['http://a', 'http://b', 'http://c'] == sorted(_read_cache_file(file_path))
+    assert (dict(JSESSIONID='ABC9'), None) == _load_session(file_path, 'http://a')
+    expected = 1 if hasattr(os, 'fdatasync') else 0  # One write for all 11 saves.
+    assert expected == len(synced)
+
+    _flush_pending_saves()
+    assert expected == len(synced)
+
+
+def test_invalid(tmpdir):
+    with pytest.raises(ValueError):
+        _save_cookies(str(tmpdir.join('.jira_session_json')), dict(JSESSIONID='ABC123'), durability='sometimes')
+
+
+@pytest.mark.httpretty
+def test_jira_write_behind(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.COOKIE_DURABILITY = 'write-behind'
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}')
+
+    with JIRA():
+        pass
+    assert not os.path.exists(JIRA.COOKIE_CACHE_FILE_PATH)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+
+    _flush_pending_saves()
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
@@ -0,0 +1,78 @@
+import json
+import re
+
+import pytest
+
+from jira_context import JIRA
+
+
+def search_callback(searches, existing, max_results=None):
+    def callback(request, _, headers):
+        searches.append(request.querystring)
+        keys = re.findall(r'"([A-Z]+-\d+)"', request.querystring['jql'][0])
+        issues = [dict(key=k, id=k.split('-')[1], self='http://localhost/jira/rest/api/2/issue/' + k,
+                       fields=dict(summary='Summary of ' + k)) for k in keys if k in existing]
+        start = int(request.querystring.get('startAt', ['0'])[0])
+        page_size = min(int(request.querystring['maxResults'][0]), max_results or len(keys))
+        return 200, headers, json.dumps(dict(startAt=start, maxResults=page_size, total=len(issues),
+                                             issues=issues[start:start + page_size]))
+    return callback
+
+
+@pytest.mark.httpretty
+def test_batches(stub_search):
+    searches = list()
+    keys = ['FAKE-{0}'.format(i) for i in range(1, 251)]
+    stub_search(search_callback(searches, set(keys) - set(['FAKE-7'])))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        issues = j.fetch_issues(keys + ['FAKE-1', 'FAKE-999'], fields=['summary'])
+
+    assert sorted(set(keys) - set(['FAKE-7'])) == sorted(issues)
+    assert 'Summary of FAKE-250' == issues['FAKE-250'].fields.summary
+    assert 3 == len(searches)
+    assert [['summary']] * 3 == [s['fields'] for s in searches]
+    assert ['false'] * 3 == [s['validateQuery'][0].lower() for s in searches]
+    jql = sorted((s['jql'][0] for s in searches), key=len)
+    assert jql[0].startswith('key in ("FAKE-201", "FAKE-202", ')
+    assert jql[0].endswith(', "FAKE-250", "FAKE-999")')
+
+
+@pytest.mark.httpretty
+def test_json_result(stub_search):
+    searches = list()
+    stub_search(search_callback(searches, set(['FAKE-1', 'FAKE-2', 'FAKE-3'])))
+    JIRA.SEARCH_BATCH_SIZE = 2
+
+    with JIRA(prompt_for_credentials=False) as j:
+        issues = j.fetch_issues(['FAKE-3', 'FAKE-1', 'FAKE-2'], json_result=True)
+
+    assert ['FAKE-1', 'FAKE-2', 'FAKE-3'] == sorted(issues)
+    assert 'Summary of FAKE-2' == issues['FAKE-2']['fields']['summary']
+    assert ['2', '2'] == [s['maxResults'][0] for s in searches]
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('json_result', [True, False])
+def test_capped_max_results(stub_search, json_result):
+    searches = list()
+    keys = ['FAKE-{0}'.format(i) for i in range(1, 8)]
+    stub_search(search_callback(searches, set(keys), max_results=2))
+    JIRA.SEARCH_BATCH_SIZE = 5
+
+    with JIRA(prompt_for_credentials=False) as j:
+        issues = j.fetch_issues(keys, json_result=json_result)
+
+    assert keys == sorted(issues)
+    assert 'Summary of FAKE-5' == (issues['FAKE-5']['fields']['summary'] if json_result else
+                                   issues['FAKE-5'].fields.summary)
+    assert [0, 0, 2, 4] == sorted(int(s.get('startAt', ['0'])[0]) for s in searches)  # Rest of the first batch paged.
+
+
+@pytest.mark.httpretty
+def test_empty(stub_search):
+    searches = list()
+    stub_search(search_callback(searches, set()))
+    with JIRA(prompt_for_credentials=False) as j:
+        assert dict() == j.fetch_issues([])
+    assert list() == searches
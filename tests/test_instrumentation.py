@@ -0,0 +1,89 @@
+import logging
+import re
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA, log_metric
+
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def register(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+
+    def session_callback(request, _, headers):
+        if request.headers.get('Authorization'):
+            headers['Set-Cookie'] = 'JSESSIONID=DEF456; Path=/'
+            return 200, headers, '{}'
+        return (200 if 'JSESSIONID=ABC123' in request.headers.get('Cookie', '') else 401), headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+
+def collect():
+    metrics = list()
+    JIRA.METRICS_CALLBACK = lambda kind, name, value: metrics.append((kind, name, value))
+    return metrics
+
+
+@pytest.mark.httpretty
+def test_cold(tmpdir):
+    register(tmpdir)
+    metrics = collect()
+    with JIRA() as j:
+        assert j.authentication_failed is False
+
+    assert [('counter', 'cookie_miss', 1)] == [m for m in metrics if m[0] == 'counter']
+    timers = [m[1] for m in metrics if m[0] == 'timer']
+    assert ['load_cookies', 'lock_wait', 'prompt', 'parent_init', 'login', 'enter', 'save_cookies'] == timers
+    assert all(isinstance(m[2], float) and m[2] >= 0 for m in metrics if m[0] == 'timer')
+
+
+@pytest.mark.httpretty
+def test_warm(tmpdir):
+    register(tmpdir)
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user')
+    metrics = collect()
+    with JIRA(prompt_for_credentials=False) as j:
+        assert j.authentication_failed is False
+
+    assert [('counter', 'cookie_hit', 1)] == [m for m in metrics if m[0] == 'counter']
+    timers = [m[1] for m in metrics if m[0] == 'timer']
+    assert ['load_cookies', 'lock_wait', 'parent_init', 'validate', 'enter', 'save_cookies'] == timers
+
+
+@pytest.mark.httpretty
+def test_fallback_401(tmpdir):
+    register(tmpdir)
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'), server='http://localhost/jira', user='user')
+    metrics = collect()
+    with JIRA() as j:
+        assert j.authentication_failed is False
+
+    counters = [m[1] for m in metrics if m[0] == 'counter']
+    assert ['cookie_hit', 'fallback_401'] == counters
+    timers = [m[1] for m in metrics if m[0] == 'timer']
+    assert ['parent_init', 'validate', 'prompt', 'login', 'enter'] == timers[2:7]
+
+
+@pytest.mark.httpretty
+def test_pool_hit(tmpdir):
+    register(tmpdir)
+    JIRA.SESSION_POOL_SIZE = 1
+    with JIRA():
+        pass
+    metrics = collect()
+    with JIRA():
+        pass
+    assert [('counter', 'pool_hit', 1)] == [m for m in metrics if m[0] == 'counter' and m[1] != 'cookie_hit']
+    assert ['load_cookies', 'enter'] == [m[1] for m in metrics if m[0] == 'timer']
+
+
+def test_log_metric(caplog):
+    caplog.set_level(logging.DEBUG, logger='jira_context')
+    log_metric('counter', 'cookie_hit', 1)
+    log_metric('timer', 'enter', 0.25)
+    assert ['counter cookie_hit 1', 'timer enter 0.25'] == [r.getMessage() for r in caplog.records]
@@ -0,0 +1,145 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_IssueStore = getattr(jira_context, '_IssueStore')
+
+
+def issue(key, updated='2014-06-01T12:00:00.000+0000', **fields):
+    project = key.split('-')[0]
+    fields.setdefault('status', dict(name='Open'))
+    return dict(key=key, id=key.split('-')[1], fields=dict(fields, updated=updated, project=dict(key=project)))
+
+
+def search_callback(issues, queries):
+    def callback(request, _, headers):
+        jql = request.querystring['jql'][0]
+        queries.append(jql)
+        matching = [i for i in issues if i['key'] in jql or i['fields']['project']['key'] in jql]
+        return 200, headers, json.dumps(dict(startAt=0, maxResults=100, total=len(matching), issues=matching))
+    return callback
+
+
+def test_put_and_find(tmpdir):
+    store = _IssueStore(str(tmpdir.join('issues.sqlite')), 'http://localhost/jira', 'user')
+    assert 1401624000 == store.put([
+        issue('FAKE-1', assignee=dict(name='alice')),
+        issue('FAKE-2', status=dict(name='Closed'), assignee=dict(accountId='5b10a2844c20165700ede21g')),
+        issue('OTHER-1', updated='2014-05-01T12:00:00.000+0000'),
+    ])
+    assert ['FAKE-1', 'FAKE-2'] == [i['key'] for i in store.find(project='FAKE')]
+    assert ['FAKE-2'] == [i['key'] for i in store.find(project=['FAKE', 'OTHER'], status='Closed')]
+    assert ['FAKE-1'] == [i['key'] for i in store.find(assignee='alice')]
+    assert ['FAKE-2'] == [i['key'] for i in store.find(assignee='5b10a2844c20165700ede21g')]
+    assert ['OTHER-1'] == [i['key'] for i in store.find(keys=['OTHER-1', 'NOPE-1'])]
+    assert ['FAKE-1', 'FAKE-2'] == [i['key'] for i in store.find(updated_since=1401624000)]
+    assert list() == _IssueStore(store.file_path, 'http://localhost/jira', 'other').find()
+    with pytest.raises(TypeError):
+        store.find(summary='x')
+
+    connection = sqlite3.connect(store.file_path)
+    plan = ' '.join(str(r) for r in connection.execute(
+        'EXPLAIN QUERY PLAN SELECT json FROM issues WHERE server = ? AND user = ? AND status IN (?)', ('', '', '')))
+    connection.close()
+    assert 'issues_status' in plan
+
+
+def test_versions(tmpdir):
+    store = _IssueStore(str(tmpdir.join('issues.sqlite')), 'http://localhost/jira', 'user')
+    store.put([issue('FAKE-1', summary='Old', priority=dict(name='Major'))])
+    store.put([dict(key='FAKE-1', fields=dict(updated='2014-06-01T12:00:00.000+0000', labels=['a']))])
+    fields = store.find()[0]['fields']
+    assert ('Old', ['a'], 'FAKE') == (fields['summary'], fields['labels'], fields['project']['key'])  # Merged.
+
+    store.put([issue('FAKE-1', updated='2014-06-02T12:00:00.000+0000', summary='New')])
+    store.put([issue('FAKE-1', updated='2014-05-01T12:00:00.000+0000', summary='Older')])  # Ignored.
+    store.put([dict(key='FAKE-1', fields=dict(summary='Unversioned'))])  # Ignored.
+    fields = store.find()[0]['fields']
+    assert ('New', None) == (fields['summary'], fields.get('labels'))
+
+
+def test_find_many_keys(tmpdir):
+    store = _IssueStore(str(tmpdir.join('issues.sqlite')), 'http://localhost/jira', 'user')
+    store.put([issue('FAKE-{0}'.format(i)) for i in range(1, 1201)])
+    keys = ['FAKE-{0}'.format(i) for i in range(1200, 0, -1)] + ['FAKE-1', 'NOPE-1']
+    assert sorted(keys[:1200]) == [i['key'] for i in store.find(keys=keys, project='FAKE')]
+
+
+def test_schema_upgrade(tmpdir):
+    file_path = str(tmpdir.join('issues.sqlite'))
+    connection = sqlite3.connect(file_path)
+    connection.execute('CREATE TABLE issues (key TEXT)')
+    connection.execute('PRAGMA user_version = 1')
+    connection.commit()
+    connection.close()
+    store = _IssueStore(file_path, 'http://localhost/jira', 'user')
+    assert list() == store.find()
+    store.put([issue('FAKE-1')])
+    assert 1 == len(store.find(project='FAKE'))
+
+
+@pytest.mark.httpretty
+def test_issue_store_and_fallback(stub_search):
+    queries = list()
+    issues = [issue('FAKE-1'), issue('FAKE-2', status=dict(name='Closed')), issue('OTHER-1')]
+    stub_search(search_callback(issues, queries))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert list() == j.find_issues(project='FAKE')
+        assert list() == queries
+
+        assert ['FAKE-1', 'FAKE-2'] == [i['key'] for i in j.find_issues(project='FAKE', fallback=True)]
+        assert ['project in ("FAKE")'] == queries
+        assert ['FAKE-2'] == [i['key'] for i in j.find_issues(project='FAKE', status='Closed', fallback=True)]
+        assert 1 == len(queries)  # Answered locally.
+
+        assert ['FAKE-1', 'OTHER-1'] == [i['key'] for i in j.find_issues(keys=['FAKE-1', 'OTHER-1'], fallback=True)]
+        assert 'key in ("OTHER-1")' == queries[-1]
+        assert ['OTHER-1'] == [i['key'] for i in j.find_issues(keys='OTHER-1', fallback=True)]
+        assert 2 == len(queries)  # Answered locally.
+
+
+@pytest.mark.httpretty
+def test_issue_store_enabled(stub_search):
+    queries = list()
+    stub_search(search_callback([issue('FAKE-1'), issue('FAKE-2'), issue('OTHER-1')], queries))
+    JIRA.ISSUE_STORE = True
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 2 == len(list(j.iter_issues('project = FAKE')))
+        assert 1 == len(j.fetch_issues(['OTHER-1']))
+        assert ['FAKE-1', 'FAKE-2', 'OTHER-1'] == [i['key'] for i in j.find_issues()]
+        assert 1 == j.sync('project = OTHER')
+    assert 3 == len(queries)
+
+
+def test_concurrent_schema_creation(tmpdir):
+    file_path = str(tmpdir.join('issues.sqlite'))
+    start, errors = threading.Event(), list()
+
+    def target(number):
+        start.wait()
+        try:
+            _IssueStore(file_path, 'http://localhost/jira', 'user').put([issue('FAKE-{0}'.format(number))])
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+
+    assert list() == errors
+    assert 8 == len(_IssueStore(file_path, 'http://localhost/jira', 'user').find())  # No store dropped another's.
+
+
+def test_private(tmpdir):
+    store = _IssueStore(str(tmpdir.join('issues.sqlite')), 'http://localhost/jira', 'user')
+    store.put([issue('FAKE-1')])
+    assert 0o600 == tmpdir.join('issues.sqlite').stat().mode & 0o777
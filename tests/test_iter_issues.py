@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+import pytest
+from jira.exceptions import JIRAError
+
+import jira_context
+from jira_context import JIRA
+
+_prefetch = getattr(jira_context, '_prefetch')
+
+
+def search_callback(total, requests_seen, error_at=None):
+    def callback(request, _, headers):
+        start, page_size = int(request.querystring['startAt'][0]), int(request.querystring['maxResults'][0])
+        requests_seen.append(start)
+        if start == error_at:
+            return 400, headers, '{"errorMessages": ["Bad page."]}'
+        issues = [dict(key='FAKE-{0}'.format(i), id=str(i), self='http://localhost/jira/rest/api/2/issue/{0}'.format(i),
+                       fields=dict()) for i in range(start, min(start + page_size, total))]
+        return 200, headers, json.dumps(dict(startAt=start, maxResults=page_size, total=total, issues=issues))
+    return callback
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('prefetch', [0, 1, 3])
+def test_pages(stub_search, prefetch):
+    requests_seen = list()
+    stub_search(search_callback(25, requests_seen))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        keys = [i.key for i in j.iter_issues('project = FAKE', page_size=10, prefetch=prefetch)]
+
+    assert ['FAKE-{0}'.format(i) for i in range(25)] == keys
+    assert [0, 10, 20] == requests_seen
+
+
+@pytest.mark.httpretty
+def test_json_result_and_empty(stub_search):
+    requests_seen = list()
+    stub_search(search_callback(3, requests_seen))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert ['FAKE-0', 'FAKE-1', 'FAKE-2'] == [i['key'] for i in j.iter_issues('project = FAKE', json_result=True)]
+        assert list() == list(j.iter_issues('project = FAKE', page_size=5, prefetch=0, startAt=3))
+    assert [0, 3] == requests_seen
+
+
+@pytest.mark.httpretty
+def test_bounded_prefetch(stub_search):
+    requests_seen = list()
+    stub_search(search_callback(1000, requests_seen))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        issues = j.iter_issues('project = FAKE', page_size=1, prefetch=2)
+        assert 'FAKE-0' == next(issues).key
+        time.sleep(0.3)
+        assert 2 <= len(requests_seen) <= 4  # Page being yielded, 2 buffered pages, and the one waiting to be buffered.
+        issues.close()
+        count = len(requests_seen)
+        time.sleep(0.3)
+        assert count == len(requests_seen)  # Background thread stopped.
+
+
+@pytest.mark.httpretty
+def test_error(stub_search):
+    requests_seen = list()
+    stub_search(search_callback(25, requests_seen, error_at=10))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        issues = j.iter_issues('project = FAKE', page_size=10)
+        assert ['FAKE-{0}'.format(i) for i in range(10)] == [next(issues).key for _ in range(10)]
+        with pytest.raises(JIRAError):
+            next(issues)
+    assert [0, 10] == requests_seen
+
+
+def test_prefetch_threads():
+    produced = list()
+    release = threading.Event()
+
+    def iterable():
+        for i in range(5):
+            produced.append(i)
+            yield i
+        release.wait(1)
+        raise ValueError('Done.')
+
+    items = _prefetch(iterable(), 2)
+    assert 0 == next(items)
+    time.sleep(0.2)
+    assert [0, 1, 2, 3] == produced  # Consumer holds 0, queue holds 1 and 2, producer waits to put 3.
+    assert [1, 2, 3, 4] == [next(items) for _ in range(4)]
+    release.set()
+    with pytest.raises(ValueError):
+        next(items)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_project = getattr(jira_context, '_project')
+
+
+def search_callback(total, requests_seen):
+    def callback(request, _, headers):
+        start, page_size = int(request.querystring['startAt'][0]), int(request.querystring['maxResults'][0])
+        requests_seen.append(request.querystring)
+        issues = [dict(key='FAKE-{0}'.format(i), id=str(i), self='http://localhost/jira/rest/api/2/issue/{0}'.format(i),
+                       fields=dict(summary='Summary {0}'.format(i), status=dict(name='Open', id='1'),
+                                   components=[dict(name='UI'), dict(name='API')], description='x' * 1000))
+                  for i in range(start, min(start + page_size, total))]
+        return 200, headers, json.dumps(dict(startAt=start, maxResults=page_size, total=total, issues=issues))
+    return callback
+
+
+@pytest.mark.httpretty
+def test_records(stub_search):
+    requests_seen = list()
+    stub_search(search_callback(25, requests_seen))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        records = list(j.iter_records('project = FAKE', ['summary', 'status.name', 'components.name', 'assignee'],
+                                      page_size=10))
+
+    assert 25 == len(records)
+    assert ('key', 'summary', 'status_name', 'components_name', 'assignee') == records[0]._fields
+    assert ('FAKE-3', 'Summary 3', 'Open', ('UI', 'API'), None) == records[3]
+    assert not hasattr(records[0], '__dict__')
+    assert records[0].status_name is records[24].status_name
+    assert ['summary,status,components,assignee'] * 3 == [','.join(r['fields']) for r in requests_seen]
+
+
+@pytest.mark.httpretty
+def test_key_and_repeated_fields(stub_search):
+    requests_seen = list()
+    stub_search(search_callback(3, requests_seen))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        records = list(j.iter_records('project = FAKE', ['key', 'summary', 'status.name', 'summary']))
+        assert ['FAKE-0', 'FAKE-1', 'FAKE-2'] == [r.key for r in j.iter_records('project = FAKE', ['key'])]
+
+    assert ('key', 'summary', 'status_name') == records[0]._fields
+    assert ('FAKE-1', 'Summary 1', 'Open') == records[1]
+    assert ['summary,status', 'key'] == [','.join(r['fields']) for r in requests_seen]
+
+
+def test_project():
+    interned = dict()
+    fields = dict(labels=['a', 'b'], status=dict(name=u'Open'), votes=dict(votes=3), reporter=None)
+    assert ('a', 'b') == _project(fields, ('labels',), interned)
+    assert 'Open' == _project(fields, ('status', 'name'), interned)
+    assert dict(name='Open') == _project(fields, ('status',), interned)
+    assert 3 == _project(fields, ('votes', 'votes'), interned)
+    assert _project(fields, ('reporter', 'name'), interned) is None
+    assert _project(fields, ('missing',), interned) is None
+    assert _project(dict(status=dict(name=u'Op' + u'en')), ('status', 'name'), interned) is interned[u'Open']
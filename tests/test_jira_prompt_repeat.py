@@ -72,3 +72,39 @@ def test_unknown_error_give_up(tmpdir, capsys):
     stdout, stderr = capsys.readouterr()
     assert '' == stdout
     assert ('Error occurred, try again.\n' == stderr)
+
+
+@pytest.mark.httpretty
+def test_bad_password_x2_one_client(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    passwords, clients = iter(['bad1', 'bad2', 'pass']), list()
+
+    def prompt(func, _):
+        if func == jira_context.INPUT:
+            return 'user'
+        clients.append(j.__dict__.get('_session'))
+        return next(passwords)
+    jira_context._prompt = prompt
+    server_info, logins = list(), list()
+
+    def server_info_callback(_, __, headers):
+        server_info.append(True)
+        return 200, headers, '{"versionNumbers":[6,4,0]}'
+
+    def session_callback(request, _, headers):
+        logins.append(base64.b64decode(request.headers['Authorization'].split(' ')[-1]).decode('ascii'))
+        if logins[-1] != 'user:pass':
+            return 401, headers, '{}'
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body=server_info_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    j = JIRA()
+    with j:
+        assert j.authentication_failed is False
+
+    assert ['user:bad1', 'user:bad2', 'user:pass'] == logins
+    assert [None, j._session, j._session] == clients
+    assert 1 == len(server_info)
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import time
+
+import httpretty
+import pytest
+from jira.exceptions import JIRAError
+
+import jira_context
+from jira_context import JIRA
+
+_load_cookies = getattr(jira_context, '_load_cookies')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+ISSUE = '{"key": "FAKE-1", "id": "1", "self": "http://localhost/jira/rest/api/2/issue/1", "fields": {}}'
+
+
+def register(tmpdir, seen, expired=('ABC000',)):
+    """Session ABC000 is accepted when entering the context but expires right after (issue calls return 401)."""
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'))
+
+    def session_callback(request, _, headers):
+        seen.append((request.method, request.path.split('/')[-1], request.headers.get('Cookie')))
+        if request.method == 'POST':
+            headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+
+    def issue_callback(request, _, headers):
+        seen.append((request.method, request.path.split('/')[-1], request.headers.get('Cookie')))
+        if request.headers.get('Cookie') in ['JSESSIONID={0}'.format(e) for e in expired]:
+            return 401, headers, '{}'
+        return 200, headers, ISSUE
+
+    def search_callback(request, _, headers):
+        status, headers, _ = issue_callback(request, _, headers)
+        return status, headers, json.dumps(dict(startAt=0, maxResults=50, total=1, issues=[json.loads(ISSUE)]))
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=issue_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/search.*'), body=search_callback)
+
+
+@pytest.mark.httpretty
+def test_keep_alive(tmpdir):
+    JIRA.KEEP_ALIVE_INTERVAL = 0.1
+    seen = list()
+    register(tmpdir, seen, expired=())
+
+    with JIRA(prompt_for_credentials=False):
+        time.sleep(0.35)
+    pings = len(seen)
+    time.sleep(0.25)
+
+    assert 3 <= pings <= 5  # Validation when entering and every 0.1 seconds after that.
+    assert [('GET', 'session', 'JSESSIONID=ABC000')] * pings == seen
+
+
+@pytest.mark.httpretty
+def test_keep_alive_password(tmpdir):
+    JIRA.KEEP_ALIVE_INTERVAL = 0.1
+    seen = list()
+    register(tmpdir, seen, expired=())
+    os.remove(JIRA.COOKIE_CACHE_FILE_PATH)
+
+    with JIRA():
+        time.sleep(0.35)
+    pings = len(seen) - 1
+    time.sleep(0.25)
+
+    assert 2 <= pings <= 4
+    assert [('POST', 'session', None)] + [('GET', 'session', 'JSESSIONID=ABC123')] * pings == seen  # No new logins.
+
+
+@pytest.mark.httpretty
+def test_keep_alive_401_no_prompt(tmpdir):
+    JIRA.KEEP_ALIVE_INTERVAL = 0.1
+    JIRA.RETRY_ON_401 = True
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'))
+    statuses, prompts = [200], list()
+    jira_context._prompt = lambda *a: prompts.append(a)
+
+    def session_callback(_, __, headers):
+        statuses.append(401)
+        return statuses[-2], headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+
+    with JIRA() as j:
+        time.sleep(0.35)
+        assert j.authentication_failed is False
+    assert 3 <= len(statuses) - 2  # Kept pinging.
+    assert list() == prompts
+
+
+@pytest.mark.httpretty
+def test_keep_alive_idle_only(tmpdir):
+    JIRA.KEEP_ALIVE_INTERVAL = 0.2
+    seen = list()
+    register(tmpdir, seen, expired=())
+
+    with JIRA(prompt_for_credentials=False) as j:
+        for _ in range(8):
+            j.issue('FAKE-1')
+            time.sleep(0.05)
+
+    assert [('GET', 'session', 'JSESSIONID=ABC000')] + [('GET', 'FAKE-1', 'JSESSIONID=ABC000')] * 8 == seen
+
+
+@pytest.mark.httpretty
+def test_not_retried_by_default(tmpdir):
+    seen = list()
+    register(tmpdir, seen)
+
+    with JIRA() as j:
+        with pytest.raises(JIRAError) as e:
+            j.issue('FAKE-1')
+    assert 401 == e.value.status_code
+    assert 2 == len(seen)
+
+
+@pytest.mark.httpretty
+def test_retry_on_401(tmpdir):
+    JIRA.RETRY_ON_401 = True
+    seen = list()
+    register(tmpdir, seen)
+
+    with JIRA() as j:
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+
+    assert [
+        ('GET', 'session', 'JSESSIONID=ABC000'),
+        ('GET', 'FAKE-1', 'JSESSIONID=ABC000'),
+        ('POST', 'session', None),
+        ('GET', 'FAKE-1', 'JSESSIONID=ABC123'),
+        ('GET', 'FAKE-1', 'JSESSIONID=ABC123'),
+    ] == seen
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_retry_once(tmpdir):
+    JIRA.RETRY_ON_401 = True
+    seen = list()
+    register(tmpdir, seen, expired=('ABC000', 'ABC123'))
+
+    with JIRA() as j:
+        with pytest.raises(JIRAError) as e:
+            j.issue('FAKE-1')
+    assert 401 == e.value.status_code
+    assert ['session', 'FAKE-1', 'session', 'FAKE-1'] == [s[1] for s in seen]
+
+
+@pytest.mark.httpretty
+def test_retry_concurrent(tmpdir):
+    JIRA.RETRY_ON_401 = True
+    seen = list()
+    register(tmpdir, seen)
+
+    with JIRA() as j:
+        results = j.search_many(['project = FAKE'] * 8, workers=8)
+
+    assert [['FAKE-1']] * 8 == [[i.key for i in r] for r in results]
+    assert 1 == len([s for s in seen if s[0] == 'POST'])
+
+
+@pytest.mark.httpretty
+def test_retry_on_401_pooled(tmpdir):
+    JIRA.RETRY_ON_401 = True
+    JIRA.SESSION_POOL_SIZE = 2
+    seen = list()
+    register(tmpdir, seen)
+
+    first = JIRA()
+    with first:
+        pass
+    second = JIRA()
+    with second:
+        before = time.time()
+        assert 'FAKE-1' == second.issue('FAKE-1').key
+        assert getattr(second, '_JIRA__authenticated_with_password') is True
+        assert dict(JSESSIONID='ABC123') == getattr(second, '_JIRA__cached_cookies')
+        assert second._session is not first._session  # Re-authenticated the instance using the session.
+        assert getattr(second, '_JIRA__last_activity') >= before
+
+    assert [
+        ('GET', 'session', 'JSESSIONID=ABC000'),
+        ('GET', 'FAKE-1', 'JSESSIONID=ABC000'),
+        ('POST', 'session', None),
+        ('GET', 'FAKE-1', 'JSESSIONID=ABC123'),
+    ] == seen
@@ -0,0 +1,95 @@
+import base64
+import gc
+import re
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import INPUT, JIRA
+
+_save_cookies = getattr(jira_context, '_save_cookies')
+_load_cookies = getattr(jira_context, '_load_cookies')
+
+
+@pytest.mark.httpretty
+def test_never_used(tmpdir):
+    jira_context._prompt = lambda *_: 0 / 0  # ZeroDivisionError if prompted.
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.LAZY_CONNECT = True
+
+    def callback(*_):
+        raise AssertionError('Connected to JIRA.')
+    httpretty.register_uri(httpretty.GET, re.compile('.*'), body=callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*'), body=callback)
+
+    with JIRA() as j:
+        assert j.ABORTED_BY_USER is False
+        assert j.authentication_failed is False
+        assert getattr(j, '_JIRA__connect_pending') is True
+
+    assert getattr(j, '_JIRA__connect_pending') is False
+    assert dict() == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_garbage_collected_without_exit(tmpdir):
+    jira_context._prompt = lambda *_: 0 / 0  # ZeroDivisionError if prompted.
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.LAZY_CONNECT = True
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+    requests_seen = list()
+
+    def callback(request, _, headers):
+        requests_seen.append(request.path)  # Exceptions raised in __del__() are ignored, record instead.
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*'), body=callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*'), body=callback)
+
+    j = JIRA()
+    j.__enter__()
+    del j
+    gc.collect()
+    assert list() == requests_seen
+
+
+@pytest.mark.httpretty
+def test_first_use_prompts(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.LAZY_CONNECT = True
+    prompted = list()
+    jira_context._prompt = lambda f, p: prompted.append(p) or ('user' if f == INPUT else 'pass')
+
+    def session_callback(request, _, headers):
+        assert 'user:pass' == base64.b64decode(request.headers['Authorization'].split(' ')[-1]).decode('ascii')
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    with JIRA() as j:
+        assert list() == prompted
+        assert [6, 4, 0] == j.server_info()['versionNumbers']
+        assert ['JIRA username: ', 'JIRA password: '] == prompted
+        assert j.authentication_failed is False
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_first_use_no_prompt_bad_cookies(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.LAZY_CONNECT = True
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}', status=401)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert j.authentication_failed is False
+        assert 'ABC123' == j._session.cookies.get('JSESSIONID')  # First access authenticates.
+        assert j.authentication_failed is True
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is False
+
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import jira.client
+import pytest
+
+from jira_context import AsyncJIRA, JIRA
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY = pytest.mark.skipif(sys.version_info < (3, 7), reason='Imported eagerly, no module __getattr__() before 3.7.')
+
+
+def run(code):
+    """Run Python code in a new interpreter with jira_context importable. Returns its stdout."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get('PYTHONPATH', '')]))
+    return subprocess.check_output([sys.executable, '-c', code], env=env).decode('ascii').split()
+
+
+@LAZY
+def test_import_skips_client():
+    code = ("import sys, jira_context\n"
+            "print(' '.join(m for m in ('asyncio', 'jira', 'jira.client', 'multiprocessing.pool', 'requests')\n"
+            "               if m in sys.modules))\n")
+    assert list() == run(code)
+
+
+@LAZY
+def test_class_attribute_imports_client():
+    code = ("import sys, jira_context\n"
+            "class Sub(jira_context.JIRA):\n"
+            "    pass\n"
+            "jira_context.JIRA.COOKIE_CACHE_FILE_PATH = None\n"
+            "print('jira.client' in sys.modules)\n"
+            "print(bool(jira_context.JIRA.DEFAULT_OPTIONS['server']))\n"
+            "import jira.client\n"
+            "print(issubclass(Sub, jira.client.JIRA))\n")
+    assert ['False', 'True', 'True'] == run(code)
+
+
+def test_subclass():
+    assert JIRA.__bases__ == (jira.client.JIRA,)
+    assert isinstance(AsyncJIRA.__new__(AsyncJIRA), jira.client.JIRA)
+    assert hasattr(JIRA, 'search_issues')
+    assert not hasattr(JIRA, 'no_such_attribute')
+
+
+@LAZY
+def test_jira_error():
+    code = ("import sys, jira_context\n"
+            "print('jira.client' in sys.modules)\n"
+            "from jira_context import JIRAError\n"
+            "import jira.exceptions\n"
+            "print(JIRAError is jira.exceptions.JIRAError, jira_context.JIRAError is JIRAError)\n"
+            "print(issubclass(jira_context.JIRA, jira.client.JIRA))\n")
+    assert ['False', 'True', 'True', 'True'] == run(code)
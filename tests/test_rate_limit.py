@@ -0,0 +1,117 @@
+import re
+import threading
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_RATE_LIMITERS = getattr(jira_context, '_RATE_LIMITERS')
+_RateLimitedAdapter = getattr(jira_context, '_RateLimitedAdapter')
+_RateLimiter = getattr(jira_context, '_RateLimiter')
+_save_cookies = getattr(jira_context, '_save_cookies')
+_take_token = getattr(jira_context, '_take_token')
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = dict() if retry_after is None else {'Retry-After': str(retry_after)}
+
+
+def test_take_token():
+    state = dict(tokens=2.0, stamp=100.0, paused_until=0.0)
+    assert 0 == _take_token(state, 100.0, 4, 2)
+    assert 0 == _take_token(state, 100.0, 4, 2)
+    assert 0.25 == _take_token(state, 100.0, 4, 2)
+    assert 0 == _take_token(state, 100.25, 4, 2)  # Refilled.
+    assert 0 == _take_token(state, 200.0, 4, 2)
+    assert 1.0 == state['tokens']  # Refilled up to burst only.
+
+    state['paused_until'] = 205.0
+    assert 5 == _take_token(state, 200.0, 4, 2)
+    assert 0 == _take_token(dict(tokens=0.0, stamp=0.0, paused_until=0.0), 0.0, 0, 2)  # No rate limit.
+
+
+def test_aimd():
+    limiter = _RateLimiter(0, 10, 8)
+    started = [limiter.acquire() for _ in range(8)]
+    assert 8 == limiter.in_flight
+
+    for s in started[:4]:
+        limiter.release(s, FakeResponse(429))
+    assert 4.0 == limiter.window  # Halved once for the whole burst.
+    limiter.release(started[4], None)  # Connection error, no change.
+    assert 4.0 == limiter.window
+
+    for _ in range(12):
+        limiter.release(limiter.acquire(), FakeResponse(200))
+    assert 6.0 < limiter.window <= 8.0
+    for _ in range(100):
+        limiter.release(limiter.acquire(), FakeResponse(200))
+    assert 8.0 == limiter.window
+
+
+def test_concurrency_window():
+    limiter = _RateLimiter(0, 10, 2)
+    held = [limiter.acquire(), limiter.acquire()]
+    acquired = threading.Event()
+
+    def target():
+        limiter.acquire()
+        acquired.set()
+    thread = threading.Thread(target=target)
+    thread.start()
+    assert not acquired.wait(0.1)  # Window full.
+    limiter.release(held[0], FakeResponse(200))
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_failed_token_step(tmpdir):
+    limiter = _RateLimiter(10, 2, 1, str(tmpdir.join('missing', '.jira_session_json_rate_limit')))
+    for _ in range(3):
+        with pytest.raises(OSError):
+            limiter.acquire()  # Lock file can't be created.
+        assert 0 == limiter.in_flight  # Slot not leaked, acquire() doesn't block the next time.
+
+
+def test_shared_pause(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json_rate_limit'))
+    first, second = _RateLimiter(0, 10, 0, file_path), _RateLimiter(0, 10, 0, file_path)
+    first.release(first.acquire(), FakeResponse(503, retry_after=0.3))
+    started = time.time()
+    second.acquire()
+    assert 0.2 < time.time() - started < 2
+
+
+def test_shared_bucket(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json_rate_limit'))
+    first, second = _RateLimiter(10, 2, 0, file_path), _RateLimiter(10, 2, 0, file_path)
+    first.acquire()
+    first.acquire()
+    started = time.time()
+    second.acquire()  # Bucket emptied by the other limiter.
+    assert 0.05 < time.time() - started < 2
+
+
+@pytest.mark.httpretty
+def test_mounted(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.RATE_LIMIT, JIRA.RATE_LIMIT_CONCURRENCY, JIRA.RATE_LIMIT_SHARED = 1000, 4, True
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}')
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert isinstance(j._session.get_adapter('http://localhost/jira/rest/api/2/serverInfo'), _RateLimitedAdapter)
+        assert [6, 4, 0] == j.server_info()['versionNumbers']
+    with JIRA(prompt_for_credentials=False):
+        pass
+
+    assert 1 == len(_RATE_LIMITERS)  # Shared by both instances.
+    limiter = list(_RATE_LIMITERS.values())[0]
+    assert (0, 4.0) == (limiter.in_flight, limiter.window)
+    assert 1 == len(tmpdir.listdir(lambda p: '_rate_limit_' in p.basename and not p.basename.endswith('.lock')))
@@ -0,0 +1,197 @@
+import json
+import os
+import re
+import time
+
+import httpretty
+import pytest
+from requests.models import PreparedRequest, Response
+
+import jira_context
+from jira_context import JIRA
+
+_ResponseCache = getattr(jira_context, '_ResponseCache')
+_load_session = getattr(jira_context, '_load_session')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+ISSUE = dict(key='FAKE-1', id='1', self='http://localhost/jira/rest/api/2/issue/1', fields=dict(summary='Cached'))
+
+
+def register(tmpdir, issue_callback, users=('user',)):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.RESPONSE_CACHE_TTLS = {'/issue/': 60, '/serverInfo$': 0}
+    for user in users:
+        _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user=user)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=issue_callback)
+    httpretty.register_uri(httpretty.PUT, re.compile('.*/issue/FAKE-1'), body=issue_callback)
+
+
+@pytest.mark.httpretty
+def test_fresh(tmpdir):
+    requests_seen = list()
+
+    def issue_callback(request, _, headers):
+        requests_seen.append(request.method)
+        return 200 if request.method == 'GET' else 204, headers, json.dumps(ISSUE)
+    register(tmpdir, issue_callback)
+
+    for _ in range(3):
+        with JIRA(prompt_for_credentials=False) as j:
+            assert 'Cached' == j.issue('FAKE-1').fields.summary
+            j._session.put('http://localhost/jira/rest/api/2/issue/FAKE-1', data='{}')  # Never cached.
+
+    assert ['GET', 'PUT', 'PUT', 'PUT'] == requests_seen
+    assert 1 == len(os.listdir(JIRA.COOKIE_CACHE_FILE_PATH + '_responses'))
+
+
+@pytest.mark.httpretty
+def test_per_user(tmpdir):
+    requests_seen = list()
+
+    def issue_callback(request, _, headers):
+        requests_seen.append(request.path)
+        return 200, headers, json.dumps(ISSUE)
+    register(tmpdir, issue_callback, users=('user', 'other_user'))
+
+    for user in ('user', 'other_user', 'user', 'other_user'):
+        JIRA.FORCE_USER = user
+        with JIRA(prompt_for_credentials=False) as j:
+            assert 'FAKE-1' == j.issue('FAKE-1').key
+
+    assert 2 == len(requests_seen)
+    assert 2 == len(os.listdir(JIRA.COOKIE_CACHE_FILE_PATH + '_responses'))
+
+
+@pytest.mark.httpretty
+def test_unknown_user_not_cached(tmpdir):
+    requests_seen = list()
+
+    def issue_callback(request, _, headers):
+        requests_seen.append(request.path)
+        return 200, headers, json.dumps(ISSUE)
+    register(tmpdir, issue_callback, users=())
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))  # No server or user.
+
+    for _ in range(2):
+        with JIRA(prompt_for_credentials=False) as j:
+            assert 'FAKE-1' == j.issue('FAKE-1').key
+
+    assert 2 == len(requests_seen)
+    assert not os.path.exists(JIRA.COOKIE_CACHE_FILE_PATH + '_responses')
+
+
+@pytest.mark.httpretty
+def test_revalidate(tmpdir):
+    conditions = list()
+
+    def issue_callback(request, _, headers):
+        conditions.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return 304, headers, ''
+        headers['ETag'] = '"v1"'
+        return 200, headers, json.dumps(ISSUE)
+    register(tmpdir, issue_callback)
+    JIRA.RESPONSE_CACHE_TTLS = {'/issue/': 0}
+
+    for _ in range(3):
+        with JIRA(prompt_for_credentials=False) as j:
+            assert 'Cached' == j.issue('FAKE-1').fields.summary
+
+    assert [None, '"v1"', '"v1"'] == conditions
+
+
+@pytest.mark.httpretty
+def test_cached_response_does_not_validate(tmpdir):
+    register(tmpdir, lambda _, __, headers: (200, headers, json.dumps(ISSUE)))
+    JIRA.TRUST_WINDOW = 60
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), time.time() - 30, 'http://localhost/jira',
+                  'user')
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 'FAKE-1' == j.issue('FAKE-1').key  # Sent to the server, validates cookies.
+    validated = _load_session(JIRA.COOKIE_CACHE_FILE_PATH, 'http://localhost/jira', 'user')[1]
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 'FAKE-1' == j.issue('FAKE-1').key  # Served from the cache.
+        assert getattr(j, '_JIRA__validation_pending') is True
+    assert validated == _load_session(JIRA.COOKIE_CACHE_FILE_PATH, 'http://localhost/jira', 'user')[1]
+
+
+class FakeAdapter(object):
+    def __init__(self):
+        self.sent = list()
+
+    def send(self, request, **_):
+        self.sent.append(request.url)
+        response = Response()
+        response.status_code = 200
+        response._content = b'x' * 100
+        response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+        response.headers['Content-Length'] = '100'
+        return response
+
+
+def test_lru(tmpdir):
+    adapter = FakeAdapter()
+    directory = str(tmpdir.join('responses'))
+    cache = _ResponseCache(adapter, directory, ['http://localhost/jira', 'user'], {'/issue/': 60}, 1400)
+
+    def get(number):
+        request = PreparedRequest()
+        request.prepare(method='GET', url='http://localhost/jira/rest/api/2/issue/FAKE-{0}'.format(number))
+        return cache.send(request)
+
+    for number in range(3):
+        get(number)
+    files = sorted(os.listdir(directory))
+    for name in files:  # Make FAKE-0 the least recently used, regardless of timestamp granularity.
+        os.utime(os.path.join(directory, name), (1, 1))
+
+    assert 3 == len(files)
+    response = get(1)
+    assert (b'x' * 100, 'UTF-8') == (response.content, response.encoding)
+    assert 'Content-Length' not in response.headers
+    assert 3 == len(adapter.sent)
+
+    for number in range(3, 12):  # Each file is 335 bytes, 4 fit.
+        get(number)
+    assert 4 == len(os.listdir(directory))
+    get(0)
+    assert 13 == len(adapter.sent)
+
+
+def test_eviction_scans(tmpdir, monkeypatch):
+    directory = str(tmpdir.join('responses'))
+    cache = _ResponseCache(FakeAdapter(), directory, ['http://localhost/jira', 'user'], {'/issue/': 60}, 33500)
+    listdir, scans = os.listdir, list()
+    monkeypatch.setattr(os, 'listdir', lambda path: scans.append(path) or listdir(path))
+
+    for number in range(130):  # Each file is about 335 bytes, 100 fit.
+        request = PreparedRequest()
+        request.prepare(method='GET', url='http://localhost/jira/rest/api/2/issue/FAKE-{0}'.format(number))
+        cache.send(request)
+    monkeypatch.undo()
+
+    assert 90 <= len(os.listdir(directory)) <= 100
+    assert 2 <= len(scans) <= 5  # First write, then only when the tracked total exceeds max_size.
+
+
+def test_evicted_after_read(tmpdir):
+    adapter = FakeAdapter()
+    cache = _ResponseCache(adapter, str(tmpdir.join('responses')), ['http://localhost/jira', 'user'], {'/issue/': 60},
+                           1400)
+    request = PreparedRequest()
+    request.prepare(method='GET', url='http://localhost/jira/rest/api/2/issue/FAKE-1')
+    cache.send(request)
+    read = cache.read
+
+    def read_and_evict(file_path):
+        entry = read(file_path)
+        os.remove(file_path)  # Another process's evict().
+        return entry
+    cache.read = read_and_evict
+
+    assert cache.send(request).from_cache is True
+    assert 1 == len(adapter.sent)
@@ -1,10 +1,12 @@
 import os
+import threading
 
 import pytest
 
 import jira_context
 
 _load_cookies = getattr(jira_context, '_load_cookies')
+_read_cache = getattr(jira_context, '_read_cache')
 _save_cookies = getattr(jira_context, '_save_cookies')
 
 FINAL_TEST_ANSWERS = (
@@ -75,3 +77,39 @@ def test_dangerous_file(tmpdir, input_dict, output_dict):
     _save_cookies(file_path, input_dict)
     assert output_dict == _load_cookies(file_path)
     assert oct(os.stat(file_path).st_mode & 0o777) in ('0600', '0o600')
+
+
+def test_atomic_no_leftovers(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='ABC123'))
+    _save_cookies(file_path, dict(JSESSIONID='DEF456'))
+
+    assert ['.jira_session_json', '.jira_session_json.lock'] == sorted(os.listdir(str(tmpdir)))
+    assert oct(os.stat(file_path + '.lock').st_mode & 0o777) in ('0600', '0o600')
+
+
+def test_atomic_failed_write(tmpdir, monkeypatch):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='ABC123'))
+
+    def replace(*_):
+        raise OSError('Disk full.')
+    monkeypatch.setattr(jira_context, '_REPLACE', replace)
+
+    with pytest.raises(OSError):
+        _save_cookies(file_path, dict(JSESSIONID='DEF456'))
+    assert dict(JSESSIONID='ABC123') == _load_cookies(file_path)
+    assert ['.jira_session_json', '.jira_session_json.lock'] == sorted(os.listdir(str(tmpdir)))
+
+
+def test_concurrent_writers(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    servers = ['http://jira{0}'.format(i) for i in range(20)]
+    threads = [threading.Thread(target=_save_cookies, args=(file_path, dict(JSESSIONID='ABC{0}'.format(i))),
+                                kwargs=dict(server=s, user='user')) for i, s in enumerate(servers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(servers) == sorted(_read_cache(file_path))
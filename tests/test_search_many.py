@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+
+import pytest
+from jira.exceptions import JIRAError
+
+import jira_context
+from jira_context import JIRA
+
+_backoff_delay = getattr(jira_context, '_backoff_delay')
+
+
+def search_body(key):
+    issue = dict(key=key, id='1', self='http://localhost/jira/rest/api/2/issue/1', fields=dict())
+    return json.dumps(dict(startAt=0, maxResults=50, total=1, issues=[issue]))
+
+
+@pytest.mark.httpretty
+def test_order_and_concurrency(stub_search):
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = list()
+
+    def search_callback(request, _, headers):
+        number = int(request.querystring['jql'][0].split()[-1])
+        assert 'JSESSIONID=ABC123' == request.headers['Cookie']
+        with lock:
+            in_flight[0] += 1
+            peak.append(in_flight[0])
+        time.sleep(0.01 * (10 - number))  # Later queries finish first.
+        with lock:
+            in_flight[0] -= 1
+        return 200, headers, search_body('FAKE-{0}'.format(number))
+    stub_search(search_callback)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        results = j.search_many(['project = FAKE AND number = {0}'.format(i) for i in range(10)], workers=4)
+
+    assert ['FAKE-{0}'.format(i) for i in range(10)] == [r[0].key for r in results]
+    assert 1 < max(peak) <= 4
+
+
+@pytest.mark.httpretty
+def test_empty(stub_search):
+    stub_search(lambda *_: 0 / 0)
+    with JIRA(prompt_for_credentials=False) as j:
+        assert list() == j.search_many([])
+
+
+@pytest.mark.httpretty
+def test_lazy_connect(stub_search):
+    JIRA.LAZY_CONNECT = True
+    stub_search(lambda _, __, headers: (200, headers, search_body('FAKE-1')))
+    with JIRA(prompt_for_credentials=False) as j:
+        results = j.search_many(['project = FAKE'] * 5)
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+    assert [['FAKE-1']] * 5 == [[i.key for i in r] for r in results]
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('retry_after', ['0', None])
+def test_backoff(stub_search, retry_after):
+    JIRA.SEARCH_BACKOFF = 0.01
+    responses = list()
+
+    def search_callback(_, __, headers):
+        responses.append(429 if len(responses) < 2 else 200)
+        if responses[-1] != 200:
+            if retry_after is not None:
+                headers['Retry-After'] = retry_after
+            return 429, headers, '{}'
+        return 200, headers, search_body('FAKE-1')
+    stub_search(search_callback)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        results = j.search_many(['project = FAKE'])
+
+    assert [429, 429, 200] == responses
+    assert 'FAKE-1' == results[0][0].key
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('status,calls', [(429, 3), (503, 1), (400, 1)])
+def test_give_up(stub_search, status, calls):
+    JIRA.SEARCH_BACKOFF = 0
+    JIRA.SEARCH_RETRIES = 2
+    responses = list()
+
+    def search_callback(_, __, headers):
+        responses.append(status)
+        return status, headers, '{}'
+    stub_search(search_callback)
+
+    with JIRA(prompt_for_credentials=False, max_retries=0) as j:  # 503 is only retried by jira's session.
+        with pytest.raises(JIRAError) as e:
+            j.search_many(['project = FAKE'])
+
+    assert status == e.value.status_code
+    assert calls == len(responses)
+
+
+class FakeError(object):
+    def __init__(self, headers):
+        self.response = type('Response', (object,), dict(headers=headers))
+
+
+@pytest.mark.parametrize('error,attempt,expected', [
+    (FakeError(dict()), 0, 1.5),
+    (FakeError(dict()), 2, 6.0),
+    (FakeError({'Retry-After': '7'}), 2, 7.0),
+    (FakeError({'Retry-After': '-1'}), 0, 0.0),
+    (FakeError({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}), 1, 3.0),
+    (object(), 0, 1.5),
+])
+def test_backoff_delay(error, attempt, expected):
+    assert expected == _backoff_delay(error, attempt, 1.5)
@@ -0,0 +1,93 @@
+import re
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_find_session = getattr(jira_context, '_find_session')
+_read_cache = getattr(jira_context, '_read_cache')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def register(tmpdir, server_info_seen, session_status=200):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+
+    def server_info_callback(_, __, headers):
+        server_info_seen.append(True)
+        return 200, headers, '{"versionNumbers":[6,4,0],"version":"6.4.0"}'
+
+    def session_callback(request, _, headers):
+        if request.method == 'POST':
+            headers['Set-Cookie'] = 'JSESSIONID=DEF456; Path=/'
+            return 200, headers, '{}'
+        return session_status, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body=server_info_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+
+def cached_server_info():
+    return _find_session(_read_cache(JIRA.COOKIE_CACHE_FILE_PATH), 'http://localhost/jira')[1]['server_info']
+
+
+def test_save_load(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='A1'), server='http://a', user='u', server_info=dict(version='6.4.0'),
+                  server_info_saved=1400000000)
+    entry = _find_session(_read_cache(file_path), 'http://a', 'u')[1]
+    assert (dict(version='6.4.0'), 1400000000) == (entry['server_info'], entry['server_info_saved'])
+
+    _save_cookies(file_path, dict(JSESSIONID='A1'), server='http://a', user='u', server_info=['invalid'],
+                  server_info_saved=1400000000)
+    entry = _find_session(_read_cache(file_path), 'http://a', 'u')[1]
+    assert (None, None) == (entry['server_info'], entry['server_info_saved'])
+
+
+@pytest.mark.httpretty
+def test_warm_start(tmpdir):
+    server_info_seen = list()
+    register(tmpdir, server_info_seen)
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user')
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert j.authentication_failed is False
+    assert 1 == len(server_info_seen)
+    assert [6, 4, 0] == cached_server_info()['versionNumbers']
+
+    for _ in range(3):
+        with JIRA(prompt_for_credentials=False) as j:
+            assert (6, 4, 0) == j._version
+    assert 1 == len(server_info_seen)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert '6.4.0' == j.server_info()['version']  # Explicit calls always ask the server.
+    assert 2 == len(server_info_seen)
+
+
+@pytest.mark.httpretty
+def test_password_retry_fetches_once(tmpdir):
+    server_info_seen = list()
+    register(tmpdir, server_info_seen, session_status=401)
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user')
+
+    with JIRA() as j:
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+    assert 1 == len(server_info_seen)
+    assert [6, 4, 0] == cached_server_info()['versionNumbers']
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('max_age,age,expected', [(60, 30, 0), (60, 90, 1), (0, 0, 1)])
+def test_max_age(tmpdir, max_age, age, expected):
+    server_info_seen = list()
+    register(tmpdir, server_info_seen)
+    JIRA.SERVER_INFO_MAX_AGE = max_age
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), server='http://localhost/jira', user='user',
+                  server_info=dict(versionNumbers=[6, 3, 0]), server_info_saved=time.time() - age)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert ((6, 4, 0) if expected else (6, 3, 0)) == j._version
+    assert expected == len(server_info_seen)
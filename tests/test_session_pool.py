@@ -0,0 +1,111 @@
+import re
+import time
+
+import httpretty
+from jira.exceptions import JIRAError
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_SESSION_POOL = getattr(jira_context, '_SESSION_POOL')
+_SessionPool = getattr(jira_context, '_SessionPool')
+_load_cookies = getattr(jira_context, '_load_cookies')
+
+
+@pytest.mark.httpretty
+def test_reuse_pooled_client(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.SESSION_POOL_SIZE = 5
+    requests_seen = list()
+
+    def session_callback(request, _, headers):
+        requests_seen.append(request.path)
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    with JIRA() as first:
+        assert first.authentication_failed is False
+        assert getattr(first, '_JIRA__authenticated_with_password') is True
+    assert 1 == len(requests_seen)
+    assert 1 == len(_SESSION_POOL)
+
+    with JIRA() as second:
+        assert second.authentication_failed is False
+        assert getattr(second, '_JIRA__authenticated_with_pool') is True
+        assert first._session is second._session
+    assert 1 == len(requests_seen)
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_pool_disabled(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+
+    with JIRA():
+        pass
+    assert 0 == len(_SESSION_POOL)
+
+
+@pytest.mark.httpretty
+def test_drop_on_401(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.SESSION_POOL_SIZE = 5
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body='{}', status=401)
+
+    with JIRA() as j:
+        assert 1 == len(_SESSION_POOL)
+        with pytest.raises(JIRAError):
+            j.issue('FAKE-1')
+    assert 0 == len(_SESSION_POOL)
+
+
+def test_max_size():
+    pool = _SessionPool()
+    pool.put('a', dict(_session='a'), 2)
+    pool.put('b', dict(_session='b'), 2)
+    assert dict(_session='a') == pool.get('a')  # 'b' is now the least recently used.
+    pool.put('c', dict(_session='c'), 2)
+
+    assert 2 == len(pool)
+    assert pool.get('b') is None
+    assert dict(_session='a') == pool.get('a')
+    assert dict(_session='c') == pool.get('c')
+
+    pool.put('d', dict(_session='d'), 0)
+    assert pool.get('d') is None
+
+
+def test_max_idle():
+    pool = _SessionPool()
+    pool.put('a', dict(_session='a'), 2)
+    getattr(pool, '_entries')['a'][0] = time.time() - 60
+
+    assert dict(_session='a') == pool.get('a', max_idle=120)
+    getattr(pool, '_entries')['a'][0] = time.time() - 60
+    assert pool.get('a', max_idle=30) is None
+    assert 0 == len(pool)
+
+
+def test_discard_other_session():
+    pool = _SessionPool()
+    pool.put('a', dict(_session='new'), 2)
+
+    pool.discard('a', session='old')
+    assert 1 == len(pool)
+    pool.discard('a', session='new')
+    assert 0 == len(pool)
@@ -0,0 +1,102 @@
+import multiprocessing
+import pickle
+import re
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import install_session_token, JIRA
+
+_find_session = getattr(jira_context, '_find_session')
+
+ISSUE = '{"key": "FAKE-1", "id": "1", "self": "http://localhost/jira/rest/api/2/issue/1", "fields": {}}'
+
+
+def parent_token(tmpdir):
+    """Log in with a password and return the session token."""
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('parent.json'))
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    with JIRA() as j:
+        return j.session_token()
+
+
+def installed_session(server):
+    return _find_session(getattr(jira_context, '_SESSION_TOKENS'), server)
+
+
+@pytest.mark.httpretty
+def test_child(tmpdir):
+    token = pickle.loads(pickle.dumps(parent_token(tmpdir)))
+    assert ('http://localhost/jira', 'user', 'ABC123') == (token['server'], token['user'], token['JSESSIONID'])
+    assert 'password' not in repr(token).lower() and 'pass' not in token.values()
+
+    # Child process.
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('child.json'))
+    install_session_token(token)
+    requests_seen = list()
+
+    def callback(request, _, headers):
+        requests_seen.append(request.path)
+        assert 'JSESSIONID=ABC123' == request.headers['Cookie']
+        return 200, headers, ISSUE
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body=callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=callback)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert list() == requests_seen  # No serverInfo (cached in the token), validation, or login.
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+
+    assert ['/jira/rest/api/2/issue/FAKE-1'] == requests_seen
+    assert not tmpdir.join('child.json').check()
+
+
+@pytest.mark.httpretty
+def test_other_server(tmpdir):
+    install_session_token(parent_token(tmpdir))
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body='{}', status=401)
+
+    with JIRA(server='http://localhost/other', prompt_for_credentials=False) as j:
+        assert j.authentication_failed is True
+
+
+@pytest.mark.httpretty
+def test_not_authenticated(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    with JIRA(prompt_for_credentials=False) as j:
+        with pytest.raises(RuntimeError):
+            j.session_token()
+
+
+@pytest.mark.parametrize('token', [
+    None,
+    dict(),
+    dict(server='http://localhost/jira', user='user', JSESSIONID='ABC 123'),
+    dict(server='http://localhost/jira', user='user', JSESSIONID='ABC123', expires=1400000000),
+])
+def test_invalid(token):
+    with pytest.raises(ValueError):
+        install_session_token(token)
+    assert dict() == getattr(jira_context, '_SESSION_TOKENS')
+
+
+@pytest.mark.httpretty
+def test_pool_initializer(tmpdir):
+    token = parent_token(tmpdir)
+    token['expires'] = time.time() + 60
+    pool = multiprocessing.Pool(2, initializer=install_session_token, initargs=(token,))
+    try:
+        results = pool.map(installed_session, ['http://localhost/jira'] * 2)
+    finally:
+        pool.close()
+        pool.join()
+    assert [('user', 'ABC123')] * 2 == [(u, s['JSESSIONID']) for u, s in results]
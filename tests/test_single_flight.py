@@ -0,0 +1,99 @@
+import re
+import threading
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_load_cookies = getattr(jira_context, '_load_cookies')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+
+def run_threads(count, prompt_for_credentials=True):
+    """Enter a JIRA context in `count` threads at once. Returns the JIRA instances."""
+    instances = [JIRA(prompt_for_credentials=prompt_for_credentials) for _ in range(count)]
+    barrier = threading.Event()
+    errors = list()
+
+    def target(instance):
+        barrier.wait()
+        try:
+            with instance:
+                pass
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in instances]
+    for thread in threads:
+        thread.start()
+    barrier.set()
+    for thread in threads:
+        thread.join()
+    assert list() == errors
+    return instances
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('count', [1, 8, 32])
+def test_expired_cookie_one_login(tmpdir, count):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'))
+    validations, logins = list(), list()
+
+    def validate_callback(request, _, headers):
+        validations.append(request.headers['Cookie'])
+        return (200 if request.headers['Cookie'] == 'JSESSIONID=ABC123' else 401), headers, '{}'
+
+    def login_callback(_, __, headers):
+        logins.append(True)
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=validate_callback)
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=login_callback)
+
+    instances = run_threads(count)
+
+    assert 1 == len(logins)
+    assert ['JSESSIONID=ABC000'] == validations
+    assert [False] * count == [i.authentication_failed for i in instances]
+    assert 'ABC123' == instances[-1]._session.cookies['JSESSIONID']
+    assert dict(JSESSIONID='ABC123') == _load_cookies(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_valid_cookie_one_validation(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'))
+    validations = list()
+
+    def validate_callback(request, _, headers):
+        validations.append(request.headers['Cookie'])
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=validate_callback)
+
+    instances = run_threads(16, prompt_for_credentials=False)
+
+    assert ['JSESSIONID=ABC123'] == validations
+    assert [False] * 16 == [i.authentication_failed for i in instances]
+
+
+@pytest.mark.httpretty
+def test_rejected_cookie_tried_once(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'))
+    validations = list()
+
+    def validate_callback(request, _, headers):
+        validations.append(request.headers['Cookie'])
+        return 401, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=validate_callback)
+
+    instances = run_threads(16, prompt_for_credentials=False)
+
+    assert ['JSESSIONID=ABC000'] == validations
+    assert [True] * 16 == [i.authentication_failed for i in instances]
@@ -0,0 +1,102 @@
+import json
+import re
+import time
+
+import httpretty
+import pytest
+
+import jira_context
+from jira_context import JIRA
+
+_IssueStore = getattr(jira_context, '_IssueStore')
+_jira_timestamp = getattr(jira_context, '_jira_timestamp')
+
+
+def jira_time(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000+0000', time.gmtime(seconds))
+
+
+def search_callback(issues, queries, fields=None):
+    """Stub search honoring `updated >= -Nm` against the issues dict (key: (updated, summary))."""
+    fields = list() if fields is None else fields
+
+    def callback(request, _, headers):
+        jql, start = request.querystring['jql'][0], int(request.querystring['startAt'][0])
+        page_size = int(request.querystring['maxResults'][0])
+        queries.append(jql)
+        fields.append(','.join(request.querystring.get('fields', [])))
+        match = re.search(r'updated >= -(\d+)m', jql)
+        since = time.time() - int(match.group(1)) * 60 if match else 0
+        matching = sorted((u, k, s) for k, (u, s) in issues.items() if u >= since)
+        page = [dict(key=k, id=k.split('-')[1], fields=dict(updated=jira_time(u), summary=s))
+                for u, k, s in matching[start:start + page_size]]
+        return 200, headers, json.dumps(dict(startAt=start, maxResults=page_size, total=len(matching), issues=page))
+    return callback
+
+
+@pytest.mark.httpretty
+def test_incremental(stub_search):
+    now = int(time.time())
+    issues = dict(('FAKE-{0}'.format(i), (now - 86400 * i, 'Old {0}'.format(i))) for i in range(1, 26))
+    queries = list()
+    stub_search(search_callback(issues, queries))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 25 == j.sync('project = FAKE ORDER BY key', page_size=10)
+        assert ['project = FAKE ORDER BY updated ASC'] * 3 == queries
+
+        del queries[:]
+        issues['FAKE-7'] = (now, 'Edited')
+        issues['FAKE-99'] = (now, 'New')
+        assert 3 == j.sync('project = FAKE ORDER BY key', page_size=10)  # FAKE-1 is within SYNC_OVERLAP.
+        assert re.match(r'^\(project = FAKE\) AND updated >= -\d+m ORDER BY updated ASC$', queries[0])
+        assert 1 == len(queries)
+
+        stored = j.find_issues()
+    assert 26 == len(stored)
+    assert 'Edited' == [i for i in stored if i['key'] == 'FAKE-7'][0]['fields']['summary']
+    assert 'New' == [i for i in stored if i['key'] == 'FAKE-99'][0]['fields']['summary']
+
+
+@pytest.mark.httpretty
+def test_separate_queries_and_fields(stub_search):
+    now = int(time.time())
+    queries, fields = list(), list()
+    stub_search(search_callback({'A-1': (now - 86400, 'a')}, queries, fields))
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 1 == j.sync('project = A', fields=['summary'])
+        assert 1 == j.sync('project = B')  # Never synced, no high-water mark yet.
+        assert 1 == j.sync('')
+    assert 'project = A ORDER BY updated ASC' == queries[0]
+    assert 'project = B ORDER BY updated ASC' == queries[1]
+    assert 'ORDER BY updated ASC' == queries[2]
+    assert 'summary,updated' == fields[0]
+
+
+@pytest.mark.httpretty
+def test_lazy_connect(stub_search, tmpdir):
+    JIRA.LAZY_CONNECT = True
+    stub_search(search_callback({'A-1': (int(time.time()), 'a')}, list()))
+    tmpdir.join('.jira_session_json').remove()  # Prompts for the username on first use.
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body='{}')
+
+    with JIRA() as j:
+        assert 1 == j.sync('project = A')
+        assert 1 == len(j.find_issues())
+    store = _IssueStore(JIRA.COOKIE_CACHE_FILE_PATH + '_issues.sqlite', 'http://localhost/jira', 'user')
+    assert store.high_water('project = A') is not None
+
+
+def test_no_cookie_cache_file():
+    j = JIRA.__new__(JIRA)
+    with pytest.raises(RuntimeError):
+        j.sync('project = FAKE')
+
+
+def test_jira_timestamp():
+    assert 0 == _jira_timestamp('1970-01-01T00:00:00.000+0000')
+    assert 1401626096.5 == _jira_timestamp('2014-06-01T14:34:56.500+0200')
+    assert 1401626096 == _jira_timestamp('2014-06-01T07:34:56-05:00')
+    assert _jira_timestamp('yesterday') is None
+    assert _jira_timestamp(None) is None
@@ -0,0 +1,169 @@
+import base64
+import re
+import time
+
+import httpretty
+import pytest
+from jira.exceptions import JIRAError
+
+import jira_context
+from jira_context import JIRA
+
+_load_session = getattr(jira_context, '_load_session')
+_save_cookies = getattr(jira_context, '_save_cookies')
+
+ISSUE = '{"key": "FAKE-1", "id": "1", "self": "http://localhost/jira/rest/api/2/issue/1", "fields": {}}'
+
+
+def test_save_load_validated(tmpdir):
+    file_path = str(tmpdir.join('.jira_session_json'))
+    _save_cookies(file_path, dict(JSESSIONID='ABC123'), 1400000000.5)
+    assert (dict(JSESSIONID='ABC123'), 1400000000.5) == _load_session(file_path)
+
+    _save_cookies(file_path, dict(JSESSIONID='ABC123'))
+    assert (dict(JSESSIONID='ABC123'), None) == _load_session(file_path)
+
+    tmpdir.join('.jira_session_json').write_binary(base64.b64encode(b'{"JSESSIONID": "ABC123", "validated": "1"}'))
+    assert (dict(JSESSIONID='ABC123'), None) == _load_session(file_path)
+
+
+@pytest.mark.httpretty
+def test_trusted_no_validation(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.TRUST_WINDOW = 60
+    validated = time.time() - 30
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), validated)
+
+    def session_callback(*_):
+        raise AssertionError('Session validated within trust window.')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+
+    with JIRA(prompt_for_credentials=False) as j:
+        assert j.authentication_failed is False
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+
+    assert (dict(JSESSIONID='ABC123'), validated) == _load_session(JIRA.COOKIE_CACHE_FILE_PATH)
+
+
+@pytest.mark.httpretty
+def test_trusted_first_call_updates_timestamp(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.TRUST_WINDOW = 60
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), time.time() - 30)
+
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=ISSUE)
+
+    before = time.time()
+    with JIRA(prompt_for_credentials=False) as j:
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+
+    cookies, validated = _load_session(JIRA.COOKIE_CACHE_FILE_PATH)
+    assert dict(JSESSIONID='ABC123') == cookies
+    assert validated >= before
+
+
+@pytest.mark.httpretty
+@pytest.mark.parametrize('pool_size', [0, 2])
+def test_trusted_401_retry(tmpdir, pool_size):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.SESSION_POOL_SIZE = pool_size
+    JIRA.TRUST_WINDOW = 60
+    cookies_seen = list()
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'), time.time() - 30)
+
+    def session_callback(request, _, headers):
+        assert 'user:pass' == base64.b64decode(request.headers['Authorization'].split(' ')[-1]).decode('ascii')
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+
+    def issue_callback(request, _, headers):
+        cookies_seen.append(request.headers['Cookie'])
+        if request.headers['Cookie'] == 'JSESSIONID=ABC000':
+            return 401, headers, '{}'
+        assert 'JSESSIONID=ABC123' == request.headers['Cookie']
+        return 200, headers, ISSUE
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=issue_callback)
+
+    with JIRA() as j:
+        assert getattr(j, '_JIRA__authenticated_with_cookies') is True
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+        assert j.authentication_failed is False
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+    assert ['JSESSIONID=ABC000', 'JSESSIONID=ABC123'] == cookies_seen  # Not retried with the rejected pooled session.
+
+    cookies, validated = _load_session(JIRA.COOKIE_CACHE_FILE_PATH)
+    assert dict(JSESSIONID='ABC123') == cookies
+    assert validated is not None
+
+
+@pytest.mark.httpretty
+def test_expired_trust_validates(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.TRUST_WINDOW = 60
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), time.time() - 120)
+    requests_seen = list()
+
+    def session_callback(request, _, headers):
+        requests_seen.append(request.path)
+        return 200, headers, '{}'
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/session'), body=session_callback)
+
+    before = time.time()
+    with JIRA(prompt_for_credentials=False) as j:
+        assert j.authentication_failed is False
+    assert 1 == len(requests_seen)
+    assert _load_session(JIRA.COOKIE_CACHE_FILE_PATH)[1] >= before
+
+
+@pytest.mark.httpretty
+def test_trusted_inconclusive_response(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.TRUST_WINDOW = 60
+    validated = time.time() - 30
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC123'), validated)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=ISSUE)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-2'), status=404, body='{}')
+
+    with JIRA(prompt_for_credentials=False) as j:
+        with pytest.raises(JIRAError):
+            j.issue('FAKE-2')
+        assert getattr(j, '_JIRA__validation_pending') is True  # HTTP 404 doesn't validate the session.
+    assert validated == _load_session(JIRA.COOKIE_CACHE_FILE_PATH)[1]
+
+    before = time.time()
+    with JIRA(prompt_for_credentials=False) as j:
+        j.issue('FAKE-1')
+        assert getattr(j, '_JIRA__validation_pending') is False
+    assert _load_session(JIRA.COOKIE_CACHE_FILE_PATH)[1] >= before
+
+
+@pytest.mark.httpretty
+def test_trusted_anonymous_response(tmpdir):
+    JIRA.COOKIE_CACHE_FILE_PATH = str(tmpdir.join('.jira_session_json'))
+    JIRA.TRUST_WINDOW = 60
+    _save_cookies(JIRA.COOKIE_CACHE_FILE_PATH, dict(JSESSIONID='ABC000'), time.time() - 30)
+    cookies_seen = list()
+
+    def session_callback(_, __, headers):
+        headers['Set-Cookie'] = 'JSESSIONID=ABC123; Path=/'
+        return 200, headers, '{}'
+
+    def issue_callback(request, _, headers):
+        cookies_seen.append(request.headers['Cookie'])
+        headers['X-AUSERNAME'] = 'anonymous' if request.headers['Cookie'] == 'JSESSIONID=ABC000' else 'user'
+        return 200, headers, ISSUE
+    httpretty.register_uri(httpretty.GET, re.compile('.*/serverInfo'), body='{"versionNumbers":[6,4,0]}')
+    httpretty.register_uri(httpretty.POST, re.compile('.*/session'), body=session_callback)
+    httpretty.register_uri(httpretty.GET, re.compile('.*/issue/FAKE-1'), body=issue_callback)
+
+    with JIRA() as j:
+        assert 'FAKE-1' == j.issue('FAKE-1').key
+        assert getattr(j, '_JIRA__authenticated_with_password') is True
+    assert ['JSESSIONID=ABC000', 'JSESSIONID=ABC123'] == cookies_seen
+    assert dict(JSESSIONID='ABC123') == _load_session(JIRA.COOKIE_CACHE_FILE_PATH)[0]